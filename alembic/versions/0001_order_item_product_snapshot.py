@@ -0,0 +1,68 @@
+"""Add product snapshot columns to order items
+
+Revision ID: 0001_order_item_snapshot
+Revises: 
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_order_item_snapshot'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SNAPSHOT_COLUMNS = ("product_name", "product_sku", "product_image_url")
+BATCH_SIZE = 1000
+
+
+def _existing_columns(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    # Tables may already have been created with these columns by create_all
+    columns = _existing_columns("order_items")
+    if columns is None:
+        return
+    
+    for name in SNAPSHOT_COLUMNS:
+        if name not in columns:
+            op.add_column("order_items", sa.Column(name, sa.String(), nullable=True))
+    
+    # Backfill existing rows from the catalog in batches
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        ids = [row[0] for row in bind.execute(
+            sa.text(
+                "SELECT id FROM order_items WHERE id > :last_id AND product_name IS NULL "
+                "ORDER BY id LIMIT :batch"
+            ),
+            {"last_id": last_id, "batch": BATCH_SIZE}
+        )]
+        if not ids:
+            break
+        bind.execute(
+            sa.text(
+                "UPDATE order_items SET "
+                "product_name = (SELECT name FROM products WHERE products.id = order_items.product_id), "
+                "product_sku = (SELECT sku FROM products WHERE products.id = order_items.product_id), "
+                "product_image_url = (SELECT image_url FROM products WHERE products.id = order_items.product_id) "
+                "WHERE id >= :first_id AND id <= :last_id AND product_name IS NULL"
+            ),
+            {"first_id": ids[0], "last_id": ids[-1]}
+        )
+        last_id = ids[-1]
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("order_items") as batch_op:
+        for name in SNAPSHOT_COLUMNS:
+            batch_op.drop_column(name)
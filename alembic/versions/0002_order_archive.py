@@ -0,0 +1,31 @@
+"""Index order items by order for archival
+
+Revision ID: 0002_order_archive
+Revises: 0001_order_item_snapshot
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_order_archive'
+down_revision = '0001_order_item_snapshot'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The archive tables themselves are created by create_all; existing
+    # databases only lack the index used to move and load items by order
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("order_items"):
+        return
+    indexes = {index["name"] for index in inspector.get_indexes("order_items")}
+    if "ix_order_items_order_id" not in indexes:
+        op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_order_items_order_id", table_name="order_items")
@@ -0,0 +1,72 @@
+"""Add normalized customer phone to orders
+
+Revision ID: 0003_order_phone_normalized
+Revises: 0002_order_archive
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.phone import try_normalize_phone
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_order_phone_normalized'
+down_revision = '0002_order_archive'
+branch_labels = None
+depends_on = None
+
+TABLES = ("orders", "orders_archive")
+BATCH_SIZE = 1000
+
+
+def _index_name(table: str) -> str:
+    return f"ix_{table}_customer_phone_normalized_created_at"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in TABLES:
+        # Tables may already have been created with the column by create_all
+        if not inspector.has_table(table):
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "customer_phone_normalized" not in columns:
+            op.add_column(table, sa.Column("customer_phone_normalized", sa.String(), nullable=True))
+        indexes = {index["name"] for index in inspector.get_indexes(table)}
+        if _index_name(table) not in indexes:
+            op.create_index(_index_name(table), table, ["customer_phone_normalized", "created_at"])
+
+        # Backfill in id batches; numbers that can't be parsed stay NULL
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.text(
+                    f"SELECT id, customer_phone FROM {table} "
+                    "WHERE id > :last_id AND customer_phone_normalized IS NULL "
+                    "ORDER BY id LIMIT :batch"
+                ),
+                {"last_id": last_id, "batch": BATCH_SIZE}
+            ).fetchall()
+            if not rows:
+                break
+            updates = [
+                {"id": row_id, "phone": normalized}
+                for row_id, normalized in ((row[0], try_normalize_phone(row[1])) for row in rows)
+                if normalized is not None
+            ]
+            if updates:
+                bind.execute(
+                    sa.text(f"UPDATE {table} SET customer_phone_normalized = :phone WHERE id = :id"),
+                    updates
+                )
+            last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(_index_name(table), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("customer_phone_normalized")
@@ -0,0 +1,47 @@
+"""Lease order worker ids with a heartbeat
+
+Revision ID: 0004_order_worker_leases
+Revises: 0003_order_phone_normalized
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_order_worker_leases'
+down_revision = '0003_order_phone_normalized'
+branch_labels = None
+depends_on = None
+
+
+def _create_table(with_heartbeat: bool):
+    columns = [
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=not with_heartbeat),
+        sa.Column("hostname", sa.String(), nullable=False),
+        sa.Column("pid", sa.Integer(), nullable=False),
+    ]
+    if with_heartbeat:
+        columns.append(sa.Column("heartbeat_at", sa.DateTime(), nullable=False))
+    columns.append(sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()))
+    op.create_table("order_number_workers", *columns)
+
+
+def upgrade() -> None:
+    # Rows are only leases of running processes and old claims carry no
+    # heartbeat, so the table is simply recreated. Stop processes running
+    # the previous code first: their worker ids are not recorded as leased
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("order_number_workers"):
+        columns = {column["name"] for column in inspector.get_columns("order_number_workers")}
+        if "heartbeat_at" in columns:
+            return  # Created by create_all with the current model
+        op.drop_table("order_number_workers")
+    _create_table(with_heartbeat=True)
+
+
+def downgrade() -> None:
+    op.drop_table("order_number_workers")
+    _create_table(with_heartbeat=False)
+    op.create_index("ix_order_number_workers_id", "order_number_workers", ["id"])
@@ -0,0 +1,43 @@
+"""Covering indexes for sales analytics
+
+Revision ID: 0005_analytics_covering_indexes
+Revises: 0004_order_worker_leases
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_analytics_covering_indexes'
+down_revision = '0004_order_worker_leases'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("orders", ["created_at", "status", "total_amount"]),
+    ("orders_archive", ["created_at", "status", "total_amount"]),
+    ("order_items", ["order_id", "product_id", "quantity", "price"]),
+    ("order_items_archive", ["order_id", "product_id", "quantity", "price"]),
+)
+
+
+def _index_name(table: str, columns) -> str:
+    return f"ix_{table}_{'_'.join(columns)}"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in INDEXES:
+        # Tables may already have been created with the indexes by create_all
+        if not inspector.has_table(table):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if _index_name(table, columns) not in existing:
+            op.create_index(_index_name(table, columns), table, columns)
+
+
+def downgrade() -> None:
+    for table, columns in INDEXES:
+        op.drop_index(_index_name(table, columns), table_name=table)
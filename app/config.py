@@ -13,6 +13,110 @@ class Settings(BaseSettings):
     whatsapp_access_token: Optional[str] = None
     whatsapp_admin_number: str = "+1234567890"  # Admin's WhatsApp number
     
+    # Admin order digest: batch new-order alerts once volume exceeds the threshold
+    whatsapp_digest_enabled: bool = False
+    whatsapp_digest_window_seconds: float = 60.0  # Sliding window for volume and flush interval
+    whatsapp_digest_immediate_threshold: int = 3  # Orders per window still sent one by one
+    whatsapp_digest_max_orders: int = 50  # Flush early once this many orders are buffered
+    whatsapp_status_quiet_seconds: float = 10.0  # Only the latest status is sent after this pause
+    
+    # Order numbers: leave unset to claim a distinct worker id from the database
+    # per process; only pin it when each id is used by exactly one process
+    order_worker_id: Optional[int] = None
+    order_worker_lease_seconds: float = 300.0  # A worker id without a heartbeat for this long is reclaimed
+    
+    # Checkout idempotency keys
+    idempotency_ttl_seconds: float = 86400.0  # How long a response can be replayed
+    idempotency_lock_seconds: float = 60.0  # After this an unfinished original is presumed dead
+    idempotency_wait_seconds: float = 30.0  # How long a duplicate waits for the original
+    
+    # Admin login: bcrypt runs on its own small pool; attempts are rate limited
+    password_hash_workers: int = 2
+    password_hash_max_queued: int = 32  # Further logins get 503 until the queue drains
+    login_rate_backend: str = "memory"  # "redis" to share limits between workers
+    login_rate_redis_url: Optional[str] = None
+    login_rate_max_keys: int = 100000
+    login_rate_capacity: float = 10  # Attempts allowed in a burst per IP / username
+    login_rate_refill_per_minute: float = 5
+    login_lockout_threshold: int = 5  # Consecutive failures before lockouts start
+    login_lockout_base_seconds: float = 30.0  # Doubles with every further failure
+    login_lockout_max_seconds: float = 3600.0
+    
+    # Authenticated admins are cached per token so requests skip the database
+    admin_cache_ttl_seconds: float = 60.0
+    admin_cache_max_entries: int = 1024
+    
+    # Live admin events: "local" for a single worker, "redis" to fan out across workers
+    event_backend: str = "local"
+    event_redis_url: Optional[str] = None
+    event_redis_channel: str = "order-events"
+    event_queue_size: int = 100  # Per connected client before it is told to resync
+    event_heartbeat_seconds: float = 15.0
+    event_stream_ticket_seconds: int = 30  # Lifetime of the single-use ticket that opens a stream
+    order_status_max_wait_seconds: float = 60.0  # Longest long-poll on an order's status
+    
+    # Phone numbers without an international prefix belong to this country
+    default_phone_country_code: str = "233"
+    
+    # Archival of delivered/cancelled orders out of the hot tables
+    archive_after_days: int = 30  # Days since an order's last change before it is archived
+    archive_batch_size: int = 500
+    
+    # Startup: create missing tables when the app starts; turn off where a deploy
+    # step runs create_schema.py instead, so cold starts skip the round trips
+    auto_create_schema: bool = True
+    openapi_cache_file: Optional[str] = None  # Prebuilt OpenAPI schema (build_openapi_cache.py)
+    
+    # Logging: written by a background thread into size-rotated files
+    log_dir: str = "logs"
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    access_log_sample_rate: float = 1.0  # Share of successful requests logged; errors always are
+    access_log_slow_ms: float = 1000.0  # Slower requests are always logged
+    
+    # Prometheus metrics: with several workers, point every worker at the same
+    # directory so /metrics on any of them reports the totals
+    metrics_dir: Optional[str] = None
+    metrics_write_interval_seconds: float = 5.0
+    # Bearer token scrapers must send; unset, /metrics only answers loopback clients
+    metrics_token: Optional[str] = None
+    
+    # Database connection pool, per engine and process (in-memory SQLite keeps a single connection)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20  # Extra connections opened under bursts, closed when returned
+    db_pool_timeout: float = 30.0  # Seconds a request waits for a connection before failing
+    db_pool_recycle: int = 1800  # Reconnect connections older than this (seconds)
+    db_pool_pre_ping: bool = True  # Test connections on checkout so dropped ones are replaced
+    
+    # Read replicas: comma-separated URLs; empty sends every read to DATABASE_URL
+    database_replica_urls: str = ""
+    replica_sticky_seconds: float = 10.0  # After a write, that client reads from the primary this long
+    replica_sticky_cookie: str = "db_primary_until"
+    
+    # SQLite performance profile, applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000  # Wait this long for the write lock
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size_mb: int = 256
+    
+    # SQL instrumentation: per-request statement counts and DB time (Server-Timing
+    # header and metrics), N+1 detection and a slow-query log with query plans.
+    # Switched per worker at runtime via /api/v1/diagnostics/sql-instrumentation
+    sql_instrumentation_enabled: bool = False
+    sql_slow_query_ms: float = 100.0  # Logged with parameters and plan; may contain customer data
+    sql_n_plus_one_threshold: int = 5  # Identical statements in one request before it is flagged
+    
+    # Sales analytics
+    analytics_chunk_size: int = 50000  # Rows fetched per round trip when loading a range
+    analytics_cache_ttl_seconds: float = 300.0
+    analytics_cache_max_entries: int = 64
+    # Ranges are assembled from cached blocks of this many UTC days, so an
+    # order event only invalidates its own block
+    analytics_block_days: int = 7
+    analytics_block_cache_max_entries: int = 256
+    analytics_block_cache_ttl_seconds: float = 3600.0
+    
     # Application settings
     debug: bool = True
     environment: str = "development"
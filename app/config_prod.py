@@ -4,6 +4,9 @@ import os
 class Settings(BaseSettings):
     # Database settings
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./ecommerce.db")
+    auto_create_schema: bool = os.getenv("AUTO_CREATE_SCHEMA", "True").lower() == "true"
+    openapi_cache_file: str = os.getenv("OPENAPI_CACHE_FILE", "")
+    metrics_dir: str = os.getenv("METRICS_DIR", "")
     
     # JWT settings
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
@@ -1,22 +1,160 @@
+import itertools
+import time
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.db_pool import apply_sqlite_pragmas, instrument_pool, pool_options
+from app.utils.query_stats import watch_engine
 
-# Create database engine
-engine = create_engine(settings.database_url)
+# Async drivers for the request handlers, by sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str):
+    """
+    The async-driver equivalent of ``url`` plus the connect args it needs.
+    asyncpg takes the libpq ``sslmode`` values as ``ssl``.
+    """
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    connect_args = {}
+    if drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        connect_args["ssl"] = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"])
+    return url.set(drivername=drivername), connect_args
+
+
+# Create database engine (scripts, migrations, background jobs)
+engine = create_engine(settings.database_url, **pool_options(settings.database_url))
+apply_sqlite_pragmas(engine)
+instrument_pool(engine, "sync")
+watch_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions for the API routers
+_async_url, _async_connect_args = async_database_url(settings.database_url)
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    **pool_options(settings.database_url, async_driver=True)
+)
+apply_sqlite_pragmas(async_engine.sync_engine)
+instrument_pool(async_engine.sync_engine, "async")
+watch_engine(async_engine.sync_engine)
+
+# Objects stay usable after commit; reload explicitly where fresh values matter
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+def _create_replica_engine(index: int, url: str):
+    replica_url, connect_args = async_database_url(url)
+    replica = create_async_engine(
+        replica_url,
+        connect_args=connect_args,
+        **pool_options(url, async_driver=True)
+    )
+    apply_sqlite_pragmas(replica.sync_engine)
+    instrument_pool(replica.sync_engine, f"replica-{index}")
+    watch_engine(replica.sync_engine)
+    return replica
+
+
+# Optional read replicas, used round robin by get_read_db
+replica_engines = [
+    _create_replica_engine(index, url.strip())
+    for index, url in enumerate(settings.database_replica_urls.split(","))
+    if url.strip()
+]
+_next_replica = itertools.cycle(replica_engines)
+
 # Create Base class
 Base = declarative_base()
 
 
-# Dependency to get database session
-def get_db():
+def create_schema():
+    """
+    Create missing tables. Runs as a deploy step (create_schema.py) or at
+    startup when AUTO_CREATE_SCHEMA is on; migrations change existing tables.
+    """
+    from app.models import models  # noqa: F401 - registers the tables
+    Base.metadata.create_all(bind=engine)
+
+
+# Dependency to get database session (primary)
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def stick_to_primary(response: Response):
+    """Send this client's reads to the primary for a while (read-your-writes)."""
+    response.set_cookie(
+        settings.replica_sticky_cookie,
+        str(int(time.time() + settings.replica_sticky_seconds)),
+        max_age=int(settings.replica_sticky_seconds),
+        httponly=True,
+        samesite="lax"
+    )
+
+
+# Dependency for handlers that write. Handlers returning a Response of their
+# own must call stick_to_primary on it: the dependency's cookie is dropped then
+async def get_write_db(response: Response):
+    stick_to_primary(response)
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _reads_from_primary(request: Request) -> bool:
+    # Read-your-writes: a client that just wrote must not read a lagging replica
+    sticky_until = request.cookies.get(settings.replica_sticky_cookie)
+    try:
+        return sticky_until is not None and float(sticky_until) > time.time()
+    except ValueError:
+        return False
+
+
+# Dependency for read-only handlers that tolerate replication lag
+async def get_read_db(request: Request):
+    if not replica_engines or _reads_from_primary(request):
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    async with AsyncSessionLocal(bind=next(_next_replica)) as db:
+        db.info["replica"] = True
+        yield db
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    return db.info.get("replica", False)
+
+
+async def dispose_async_engines():
+    await async_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
+# Dependency for the few handlers that still run synchronous code (analytics)
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,4 +1,7 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
@@ -10,26 +13,52 @@ try:
 except ImportError:
     from app.config import settings
 
-from app.database import engine
-from app.models import models
+from app.database import create_schema, dispose_async_engines
 from app.utils.exceptions import (
     http_exception_handler,
     validation_exception_handler,
     general_exception_handler
 )
-from app.utils.middleware import LoggingMiddleware
+from app.utils.logging import configure_logging, shutdown_logging
+from app.utils.middleware import LoggingMiddleware, MetricsMiddleware, QueryStatsMiddleware
+from app.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics, run_snapshot_writer
+from app.utils.dependencies import require_metrics_access
+from app.utils.events import event_broker
+from app.utils.notifications import flush_pending_notifications
+from app.utils.openapi_cache import install_openapi_cache
+from app.utils.order_numbers import get_order_id_generator
 
 # Import routers
-from app.routers import auth, products, cart, orders
+from app.routers import auth, products, cart, orders, analytics, diagnostics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    if settings.auto_create_schema:
+        await run_in_threadpool(create_schema)
+    # Listen before serving, so long-poll waiters and cache invalidation hear other workers
+    await run_in_threadpool(event_broker.start)
+    # Claim the order worker id now rather than on the first order
+    await run_in_threadpool(get_order_id_generator)
+    snapshot_writer = asyncio.create_task(run_snapshot_writer()) if settings.metrics_dir else None
+    yield
+    if snapshot_writer is not None:
+        snapshot_writer.cancel()
+        await asyncio.gather(snapshot_writer, return_exceptions=True)
+    # Don't lose orders still buffered in a WhatsApp digest
+    flush_pending_notifications()
+    event_broker.stop()
+    await dispose_async_engines()
+    shutdown_logging()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="ShopEasy E-Commerce API",
     description="A comprehensive e-commerce backend API",
     version="1.0.0",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # CORS middleware with production settings
@@ -41,8 +70,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add logging middleware
+# Access logging, request metrics and per-request SQL statistics
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 
 # Serve static files (for production)
 if os.path.exists("frontend"):
@@ -58,6 +89,8 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(products.router, prefix="/api/v1/products", tags=["Products"])
 app.include_router(cart.router, prefix="/api/v1/cart", tags=["Shopping Cart"])
 app.include_router(orders.router, prefix="/api/v1/orders", tags=["Orders"])
+app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["Analytics"])
+app.include_router(diagnostics.router, prefix="/api/v1/diagnostics", tags=["Diagnostics"])
 
 @app.get("/")
 async def root():
@@ -72,6 +105,12 @@ async def root():
 async def health_check():
     return {"status": "healthy", "database": "connected"}
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    return Response(await render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+install_openapi_cache(app, settings.openapi_cache_file)
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Table, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -81,6 +81,7 @@ class Order(Base):
     order_number = Column(String, unique=True, index=True, nullable=False)
     customer_name = Column(String, nullable=False)
     customer_phone = Column(String, nullable=False)
+    customer_phone_normalized = Column(String, nullable=True)  # E.164, for lookups by phone
     customer_address = Column(Text, nullable=False)
     status = Column(String, default="pending")  # pending, confirmed, preparing, ready, delivered, cancelled
     total_amount = Column(Float, nullable=False)
@@ -92,20 +93,144 @@ class Order(Base):
     # Relationships
     order_items = relationship("OrderItem", back_populates="order")
 
+    __table_args__ = (
+        Index("ix_orders_customer_phone_normalized_created_at", "customer_phone_normalized", "created_at"),
+        # Covers the sales analytics range scans
+        Index("ix_orders_created_at_status_total_amount", "created_at", "status", "total_amount"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)  # Price at time of order
+    # Snapshot of the product as sold, so order reads don't join the catalog
+    product_name = Column(String, nullable=True)
+    product_sku = Column(String, nullable=True)
+    product_image_url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     order = relationship("Order", back_populates="order_items")
     product = relationship("Product", back_populates="order_items")
 
+    __table_args__ = (
+        # Lets sales analytics read an order's items from the index alone
+        Index("ix_order_items_order_id_product_id_quantity_price", "order_id", "product_id", "quantity", "price"),
+    )
+
+
+class ArchivedOrder(Base):
+    __tablename__ = "orders_archive"
+
+    # Same columns as orders; rows keep their original ids when archived
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_number = Column(String, unique=True, index=True, nullable=False)
+    customer_name = Column(String, nullable=False)
+    customer_phone = Column(String, nullable=False)
+    customer_phone_normalized = Column(String, nullable=True)
+    customer_address = Column(Text, nullable=False)
+    status = Column(String, nullable=False)
+    total_amount = Column(Float, nullable=False)
+    notes = Column(Text, nullable=True)
+    whatsapp_sent = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), index=True)
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    order_items = relationship("ArchivedOrderItem", back_populates="order")
+
+    __table_args__ = (
+        Index("ix_orders_archive_customer_phone_normalized_created_at", "customer_phone_normalized", "created_at"),
+        Index("ix_orders_archive_created_at_status_total_amount", "created_at", "status", "total_amount"),
+    )
+
+
+class ArchivedOrderItem(Base):
+    __tablename__ = "order_items_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, ForeignKey("orders_archive.id"), nullable=False, index=True)
+    product_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False)
+    product_name = Column(String, nullable=True)
+    product_sku = Column(String, nullable=True)
+    product_image_url = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    order = relationship("ArchivedOrder", back_populates="order_items")
+
+    __table_args__ = (
+        Index(
+            "ix_order_items_archive_order_id_product_id_quantity_price",
+            "order_id", "product_id", "quantity", "price"
+        ),
+    )
+
+
+class OrderStatusStats(Base):
+    __tablename__ = "order_status_stats"
+
+    # One row per order status, maintained in the same transaction as order changes
+    status = Column(String, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)  # Hash of the request body
+    status_code = Column(Integer, nullable=True)  # Null while the original request runs
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    locked_until = Column(DateTime, nullable=False)
+
+
+class OrderEvent(Base):
+    __tablename__ = "order_events"
+
+    # Monotonic change sequence; clients sync with "changes since seq N"
+    seq = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)  # No FK: orders may be archived
+    order_number = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # created, status_changed, notes_edited
+    status = Column(String, nullable=True)
+    old_status = Column(String, nullable=True)
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        {"sqlite_autoincrement": True},  # Never reuse sequence numbers
+    )
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Row can be purged after this
+
+
+class OrderNumberWorker(Base):
+    __tablename__ = "order_number_workers"
+
+    # One row per worker id (0-1023) leased by a live process for order numbers;
+    # the process renews heartbeat_at, and ids whose lease ran out are reclaimed
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    hostname = Column(String, nullable=False)
+    pid = Column(Integer, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 
 # Remove Review model since we don't need user reviews for this simple setup
\ No newline at end of file
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Optional
+from dataclasses import asdict
+from app.database import get_sync_db
+from app.models.models import Admin
+from app.utils.analytics import SalesAnalytics, get_sales_analytics
+from app.utils.dependencies import get_current_admin_user
+
+router = APIRouter()
+
+MAX_RANGE_DAYS = 1096
+
+
+def get_range_analytics(
+    start: Optional[date] = Query(None, description="First day of the range (defaults to 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last day of the range, inclusive (defaults to today)"),
+    utc_offset_hours: int = Query(0, ge=-12, le=14, description="Local time offset used for day and hour buckets"),
+    top_n: int = Query(10, ge=1, le=100, description="Number of top products to return"),
+    current_admin: Admin = Depends(get_current_admin_user),
+    db: Session = Depends(get_sync_db)
+) -> SalesAnalytics:
+    """Resolve the requested range and return its (cached) analytics."""
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_RANGE_DAYS} days")
+    
+    return get_sales_analytics(db, start, end, utc_offset_hours, top_n)
+
+
+@router.get("/sales")
+def sales_summary(analytics: SalesAnalytics = Depends(get_range_analytics)):
+    """Get all sales aggregates for a date range (admin only)."""
+    return asdict(analytics)
+
+
+@router.get("/revenue")
+def revenue(analytics: SalesAnalytics = Depends(get_range_analytics)):
+    """Get revenue per day and per hour of day (admin only)."""
+    return {
+        "start": analytics.start,
+        "end": analytics.end,
+        "total_revenue": analytics.total_revenue,
+        "by_day": analytics.revenue_by_day,
+        "by_hour": analytics.revenue_by_hour
+    }
+
+
+@router.get("/top-products")
+def top_products(analytics: SalesAnalytics = Depends(get_range_analytics)):
+    """Get best-selling products by units and by revenue (admin only)."""
+    return {
+        "start": analytics.start,
+        "end": analytics.end,
+        "by_units": analytics.top_products_by_units,
+        "by_revenue": analytics.top_products_by_revenue
+    }
+
+
+@router.get("/average-order-value")
+def average_order_value(analytics: SalesAnalytics = Depends(get_range_analytics)):
+    """Get order count, revenue and average order value (admin only)."""
+    return {
+        "start": analytics.start,
+        "end": analytics.end,
+        "order_count": analytics.order_count,
+        "item_count": analytics.item_count,
+        "total_revenue": analytics.total_revenue,
+        "average_order_value": analytics.average_order_value
+    }
@@ -1,23 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.database import get_db
+from app.database import get_db, get_write_db
 from app.models.models import Admin
 from app.schemas.schemas import AdminCreate, Admin as AdminSchema, Token
-from app.utils.auth import verify_password, get_password_hash, create_access_token
+from app.utils.admin_identity import AdminIdentity, invalidate_admin, revoke_token
+from app.utils.auth import PasswordHasherBusy, verify_password_async, get_password_hash_async, create_access_token
+from app.utils.dependencies import get_current_admin_user, get_token_claims
+from app.utils.rate_limit import login_rate_limiter
 from app.config import settings
 
 router = APIRouter()
 
 
+def _password_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/admin/register", response_model=AdminSchema)
-def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
+async def register_admin(admin: AdminCreate, db: AsyncSession = Depends(get_write_db)):
     """Register a new admin (for initial setup only)."""
     # Check if admin already exists
-    db_admin = db.query(Admin).filter(
-        (Admin.email == admin.email) | (Admin.username == admin.username)
-    ).first()
+    db_admin = (await db.execute(
+        select(Admin).where((Admin.email == admin.email) | (Admin.username == admin.username))
+    )).first()
     
     if db_admin:
         raise HTTPException(
@@ -26,7 +39,10 @@ def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
         )
     
     # Create new admin
-    hashed_password = get_password_hash(admin.password)
+    try:
+        hashed_password = await get_password_hash_async(admin.password)
+    except PasswordHasherBusy:
+        raise _password_busy()
     db_admin = Admin(
         email=admin.email,
         username=admin.username,
@@ -34,27 +50,53 @@ def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_admin)
-    db.commit()
-    db.refresh(db_admin)
+    await db.commit()
+    await db.refresh(db_admin)
     
     return db_admin
 
 
 @router.post("/admin/login", response_model=Token)
-def admin_login(
+async def admin_login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Admin login."""
-    admin = db.query(Admin).filter(Admin.username == form_data.username).first()
+    # Throttle per client and per account before spending any bcrypt time
+    limit_keys = [
+        f"ip:{request.client.host if request.client else 'unknown'}",
+        f"user:{form_data.username.lower()}"
+    ]
+    retry_after = max([await login_rate_limiter.acquire(key) for key in limit_keys])
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
     
-    if not admin or not verify_password(form_data.password, admin.hashed_password):
+    admin = (await db.execute(
+        select(Admin).where(Admin.username == form_data.username)
+    )).scalar_one_or_none()
+    
+    try:
+        valid = admin is not None and await verify_password_async(form_data.password, admin.hashed_password)
+    except PasswordHasherBusy:
+        raise _password_busy()
+    
+    if not valid:
+        for key in limit_keys:
+            await login_rate_limiter.record_failure(key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    for key in limit_keys:
+        await login_rate_limiter.record_success(key)
+    
     if not admin.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -66,4 +108,31 @@ def admin_login(
         data={"sub": admin.username}, expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.post("/admin/logout")
+async def admin_logout(claims: dict = Depends(get_token_claims)):
+    """Revoke the current access token."""
+    await revoke_token(claims)
+    return {"message": "Logged out"}
+
+
+@router.post("/admin/{admin_id}/deactivate", response_model=AdminSchema)
+async def deactivate_admin(
+    admin_id: int,
+    current_admin: AdminIdentity = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """Deactivate an admin account; its tokens stop working immediately."""
+    db_admin = await db.get(Admin, admin_id)
+    
+    if not db_admin:
+        raise HTTPException(status_code=404, detail="Admin not found")
+    
+    db_admin.is_active = False
+    await db.commit()
+    await db.refresh(db_admin)
+    invalidate_admin(db_admin.username)
+    
+    return db_admin
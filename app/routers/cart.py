@@ -1,50 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from app.database import get_db, get_write_db
 from app.models.models import CartItem, Product
 from app.schemas.schemas import CartItem as CartItemSchema, CartItemCreate, CartItemUpdate
 
 router = APIRouter()
 
 
+def _cart_items_query():
+    # Cart items are serialized with their product and its categories
+    return select(CartItem).options(
+        selectinload(CartItem.product).selectinload(Product.categories)
+    )
+
+
+async def _get_cart_item(db: AsyncSession, cart_item_id: int, session_id: str) -> Optional[CartItem]:
+    query = _cart_items_query().where(
+        CartItem.id == cart_item_id,
+        CartItem.session_id == session_id
+    ).execution_options(populate_existing=True)
+    return (await db.execute(query)).scalar_one_or_none()
+
+
 @router.get("/{session_id}", response_model=List[CartItemSchema])
-def get_cart_items(
+async def get_cart_items(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get cart items for a guest session."""
-    cart_items = db.query(CartItem).filter(CartItem.session_id == session_id).all()
+    cart_items = (await db.execute(
+        _cart_items_query().where(CartItem.session_id == session_id)
+    )).scalars().all()
     return cart_items
 
 
 @router.post("/", response_model=CartItemSchema)
-def add_to_cart(
+async def add_to_cart(
     cart_item: CartItemCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Add item to guest cart or update quantity if item already exists."""
     # Check if product exists and is active
-    product = db.query(Product).filter(
-        Product.id == cart_item.product_id,
-        Product.is_active == True
-    ).first()
+    product = (await db.execute(
+        select(Product.id).where(
+            Product.id == cart_item.product_id,
+            Product.is_active == True
+        )
+    )).first()
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Check if item already in cart
-    existing_item = db.query(CartItem).filter(
-        CartItem.session_id == cart_item.session_id,
-        CartItem.product_id == cart_item.product_id
-    ).first()
+    existing_item = (await db.execute(
+        select(CartItem).where(
+            CartItem.session_id == cart_item.session_id,
+            CartItem.product_id == cart_item.product_id
+        )
+    )).scalar_one_or_none()
     
     if existing_item:
         # Update quantity
         existing_item.quantity += cart_item.quantity
-        db.commit()
-        db.refresh(existing_item)
-        return existing_item
+        await db.commit()
+        return await _get_cart_item(db, existing_item.id, cart_item.session_id)
     else:
         # Create new cart item
         db_cart_item = CartItem(
@@ -53,81 +75,82 @@ def add_to_cart(
             quantity=cart_item.quantity
         )
         db.add(db_cart_item)
-        db.commit()
-        db.refresh(db_cart_item)
-        return db_cart_item
+        await db.commit()
+        return await _get_cart_item(db, db_cart_item.id, cart_item.session_id)
 
 
 @router.put("/{cart_item_id}", response_model=CartItemSchema)
-def update_cart_item(
+async def update_cart_item(
     cart_item_id: int,
     cart_item_update: CartItemUpdate,
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Update cart item quantity."""
-    cart_item = db.query(CartItem).filter(
-        CartItem.id == cart_item_id,
-        CartItem.session_id == session_id
-    ).first()
+    cart_item = await _get_cart_item(db, cart_item_id, session_id)
     
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     
     cart_item.quantity = cart_item_update.quantity
-    db.commit()
-    db.refresh(cart_item)
-    return cart_item
+    await db.commit()
+    return await _get_cart_item(db, cart_item_id, session_id)
 
 
 @router.delete("/{cart_item_id}")
-def remove_from_cart(
+async def remove_from_cart(
     cart_item_id: int,
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Remove item from cart."""
-    cart_item = db.query(CartItem).filter(
-        CartItem.id == cart_item_id,
-        CartItem.session_id == session_id
-    ).first()
+    cart_item = (await db.execute(
+        select(CartItem).where(
+            CartItem.id == cart_item_id,
+            CartItem.session_id == session_id
+        )
+    )).scalar_one_or_none()
     
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     
-    db.delete(cart_item)
-    db.commit()
+    await db.delete(cart_item)
+    await db.commit()
     return {"message": "Item removed from cart"}
 
 
 @router.delete("/{session_id}/clear")
-def clear_cart(
+async def clear_cart(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Clear all items from cart."""
-    db.query(CartItem).filter(CartItem.session_id == session_id).delete()
-    db.commit()
+    await db.execute(delete(CartItem).where(CartItem.session_id == session_id))
+    await db.commit()
     return {"message": "Cart cleared successfully"}
 
 
 @router.get("/{session_id}/total")
-def get_cart_total(
+async def get_cart_total(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get cart total amount."""
-    cart_items = db.query(CartItem).filter(CartItem.session_id == session_id).all()
+    cart_items = (await db.execute(
+        select(CartItem.quantity, Product.price)
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.session_id == session_id)
+    )).all()
     
     total = 0
     item_count = 0
     
-    for item in cart_items:
-        total += item.product.price * item.quantity
-        item_count += item.quantity
+    for quantity, price in cart_items:
+        total += price * quantity
+        item_count += quantity
     
     return {
         "total_amount": total,
         "item_count": item_count,
         "items": len(cart_items)
-    }
\ No newline at end of file
+    }
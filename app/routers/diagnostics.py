@@ -0,0 +1,43 @@
+import os
+from fastapi import APIRouter, Depends
+from app.config import settings
+from app.models.models import Admin
+from app.schemas.schemas import SqlInstrumentationStatus, SqlInstrumentationUpdate
+from app.utils import query_stats
+from app.utils.db_pool import get_pool_metrics
+from app.utils.dependencies import get_current_admin_user
+from app.utils.logging import log_info
+
+router = APIRouter()
+
+
+def _sql_instrumentation_status() -> SqlInstrumentationStatus:
+    return SqlInstrumentationStatus(
+        enabled=query_stats.is_enabled(),
+        worker=os.getpid(),
+        slow_query_ms=settings.sql_slow_query_ms,
+        n_plus_one_threshold=settings.sql_n_plus_one_threshold
+    )
+
+
+@router.get("/sql-instrumentation", response_model=SqlInstrumentationStatus)
+async def get_sql_instrumentation(current_admin: Admin = Depends(get_current_admin_user)):
+    """Whether SQL is counted per request and slow queries are logged (admin only)."""
+    return _sql_instrumentation_status()
+
+
+@router.put("/sql-instrumentation", response_model=SqlInstrumentationStatus)
+async def set_sql_instrumentation(
+    update: SqlInstrumentationUpdate,
+    current_admin: Admin = Depends(get_current_admin_user)
+):
+    """Switch SQL instrumentation on or off in every worker (admin only)."""
+    query_stats.set_enabled(update.enabled)
+    log_info(f"SQL instrumentation {'enabled' if update.enabled else 'disabled'} by {current_admin.username}")
+    return _sql_instrumentation_status()
+
+
+@router.get("/db-pool")
+async def db_pool_metrics(current_admin: Admin = Depends(get_current_admin_user)):
+    """Checkout wait and saturation per connection pool in this worker (admin only)."""
+    return get_pool_metrics()
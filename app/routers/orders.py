@@ -1,33 +1,180 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-import uuid
-from datetime import datetime
-from app.database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+from datetime import date, datetime
+import asyncio
+from app.config import settings
+from app.database import AsyncSessionLocal, get_db, get_read_db, get_write_db, is_replica_session, stick_to_primary
 from app.models.models import Order, OrderItem, CartItem, Product, Admin
 from app.schemas.schemas import (
     Order as OrderSchema,
     GuestOrderCreate,
     OrderUpdate,
-    OrderStatus
+    OrderStatus,
+    BulkOrderStatusUpdate,
+    BulkOrderStatusResult,
+    OrderChangeFeed,
+    OrderHistoryPage,
+    OrderStatusSnapshot,
+    StreamTicket
+)
+from app.utils.archive import find_order_by_number, find_order_status, find_orders_by_phone, run_archive_job
+from app.utils.auth import create_stream_ticket
+from app.utils.dependencies import get_current_admin_user, get_current_admin_user_from_ticket
+from app.utils.events import (
+    event_broker,
+    format_sse,
+    order_status_waiters,
+    publish_order_created,
+    publish_order_status_changed,
+    publish_orders_status_changed
+)
+from app.utils.idempotency import (
+    IdempotencyInProgress,
+    IdempotencyKeyMismatch,
+    StoredResponse,
+    idempotency_store,
+    request_fingerprint
+)
+from app.utils.order_changes import (
+    NOTES_EDITED,
+    ORDER_CREATED,
+    STATUS_CHANGED,
+    read_order_changes,
+    record_bulk_status_events,
+    record_order_event
+)
+from app.utils.order_export import stream_orders_csv, stream_orders_ndjson
+from app.utils.order_numbers import next_order_number
+from app.utils.phone import normalize_phone
+from app.utils.order_stats import (
+    read_order_stats,
+    reconcile_order_stats,
+    record_bulk_status_change,
+    record_order_created,
+    record_status_change
+)
+from app.utils.notifications import (
+    get_notification_metrics,
+    notify_admin_new_order,
+    notify_customer_status_change,
+    notify_customers_status_change
 )
-from app.utils.dependencies import get_current_admin_user
-from app.utils.whatsapp import send_order_notification, send_order_status_update
 
 router = APIRouter()
 
+# Order lifecycle used to validate bulk updates: orders only move forward,
+# and any order that is not yet delivered can be cancelled
+STATUS_FLOW = ["pending", "confirmed", "preparing", "ready", "delivered"]
+TERMINAL_STATUSES = {"delivered", "cancelled"}
+# A single status update re-reads the status this often before giving up
+STATUS_UPDATE_ATTEMPTS = 3
 
-def generate_order_number() -> str:
-    """Generate unique order number."""
-    return f"ORD-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+
+def allowed_source_statuses(target: str) -> List[str]:
+    """Statuses an order may be moved from to reach ``target``."""
+    if target == "cancelled":
+        return [s for s in STATUS_FLOW if s not in TERMINAL_STATUSES]
+    return STATUS_FLOW[:STATUS_FLOW.index(target)]
+
+
+async def _load_order(db: AsyncSession, order_id: int, lock: bool = False) -> Optional[Order]:
+    """Fresh copy of an order with its items, ready to serialize."""
+    stmt = (
+        select(Order)
+        .options(selectinload(Order.order_items))
+        .where(Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    if lock:
+        stmt = stmt.with_for_update()
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
 @router.post("/", response_model=OrderSchema)
-def create_guest_order(
+async def create_guest_order(
     order: GuestOrderCreate,
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key; retries with the same key replay the original response"
+    ),
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Create order from guest cart items or direct items."""
+    if not idempotency_key:
+        return await place_guest_order(order, db)
+    
+    key = f"orders:create:{idempotency_key}"
+    try:
+        # May wait for a concurrent request with the same key, so keep it off the loop
+        stored = await run_in_threadpool(
+            idempotency_store.begin, key, request_fingerprint(order.model_dump_json())
+        )
+    except IdempotencyKeyMismatch:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+    
+    if stored is None:
+        try:
+            db_order = await save_guest_order(order, db, idempotency_key=key)
+        except Exception:
+            # Only releases the key if the order didn't commit
+            await run_in_threadpool(idempotency_store.release, key)
+            raise
+        idempotency_store.notify(key)
+        # The same bytes that were stored with the order
+        stored = _order_response(db_order)
+        await notify_new_order(db, db_order)
+        replayed = "false"
+    else:
+        replayed = "true"
+    
+    response = Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": replayed}
+    )
+    stick_to_primary(response)
+    return response
+
+
+def _order_response(db_order: Order) -> StoredResponse:
+    return StoredResponse(
+        status_code=status.HTTP_200_OK,
+        body=OrderSchema.model_validate(db_order).model_dump_json().encode("utf-8")
+    )
+
+
+async def place_guest_order(order: GuestOrderCreate, db: AsyncSession) -> Order:
+    """Validate the order, create it with its items and notify the admin."""
+    return await notify_new_order(db, await save_guest_order(order, db))
+
+
+async def save_guest_order(
+    order: GuestOrderCreate,
+    db: AsyncSession,
+    idempotency_key: Optional[str] = None
+) -> Order:
+    """
+    Validate the order and commit it with its items. With an idempotency
+    key, the response is stored in the same transaction, so a retry after
+    the order committed can only replay it.
+    """
     order_items_data = []
     
     if order.items:
@@ -36,7 +183,7 @@ def create_guest_order(
         
         for item_input in order.items:
             # Get product and validate
-            product = db.query(Product).filter(Product.id == item_input.product_id).first()
+            product = await db.get(Product, item_input.product_id)
             if not product:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -61,14 +208,18 @@ def create_guest_order(
             total_amount += item_total
             
             order_items_data.append({
-                'product_id': product.id,
+                'product': product,
                 'quantity': item_input.quantity,
                 'price': item_input.price
             })
             
     elif order.session_id:
         # Session-based cart items
-        cart_items = db.query(CartItem).filter(CartItem.session_id == order.session_id).all()
+        cart_items = (await db.execute(
+            select(CartItem)
+            .options(selectinload(CartItem.product))
+            .where(CartItem.session_id == order.session_id)
+        )).scalars().all()
         
         if not cart_items:
             raise HTTPException(
@@ -97,47 +248,78 @@ def create_guest_order(
                 )
             
             # Calculate item total
+            item_total = product.price * cart_item.quantity
+            total_amount += item_total
+            
+            order_items_data.append({
+                'product': product,
+                'quantity': cart_item.quantity,
+                'price': product.price
+            })
+    
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order must include items or a session_id"
+        )
+    
     # Create order
-    order_number = generate_order_number()
+    order_number = await next_order_number()
     db_order = Order(
         order_number=order_number,
         customer_name=order.customer_name,
         customer_phone=order.customer_phone,
+        customer_phone_normalized=normalize_phone(order.customer_phone),  # Validated by GuestOrderCreate
         customer_address=order.customer_address,
         total_amount=total_amount,
         notes=order.notes
     )
     
     db.add(db_order)
-    db.flush()  # Get the order ID
+    await db.flush()  # Get the order ID
     
-    # Create order items and update stock
+    # Create order items with a snapshot of the product as sold, and update stock
     for item_data in order_items_data:
+        product = item_data["product"]
         order_item = OrderItem(
             order_id=db_order.id,
-            product_id=item_data["product_id"],
+            product_id=product.id,
             quantity=item_data["quantity"],
-            price=item_data["price"]
+            price=item_data["price"],
+            product_name=product.name,
+            product_sku=product.sku,
+            product_image_url=product.image_url
         )
         db.add(order_item)
         
         # Update product stock
-        product = db.query(Product).filter(Product.id == item_data["product_id"]).first()
         product.stock_quantity -= item_data["quantity"]
     
     # Clear session cart if session_id was provided
     if order.session_id:
-        db.query(CartItem).filter(CartItem.session_id == order.session_id).delete()
+        await db.execute(delete(CartItem).where(CartItem.session_id == order.session_id))
     
-    db.commit()
-    db.refresh(db_order)
-    
-    # Send WhatsApp notification to admin
+    # The shared helpers are synchronous; run them on this session's connection
+    await db.run_sync(record_order_created, db_order)
+    seq = (await db.run_sync(record_order_event, ORDER_CREATED, db_order)).seq
+    if idempotency_key is not None:
+        response = _order_response(await _load_order(db, db_order.id))
+        await db.run_sync(idempotency_store.store_response, idempotency_key, response)
+    await db.commit()
+    db_order = await _load_order(db, db_order.id)
+    publish_order_created(db_order, seq)
+    return db_order
+
+
+async def notify_new_order(db: AsyncSession, db_order: Order) -> Order:
+    """Tell the admin about a committed order; failures never fail the order."""
+    # Send WhatsApp notification to admin (may call the WhatsApp API)
     try:
-        success = send_order_notification(db_order)
+        success = await run_in_threadpool(notify_admin_new_order, db_order)
         if success:
             db_order.whatsapp_sent = True
-            db.commit()
+            await db.commit()
+            db_order = await _load_order(db, db_order.id)
     except Exception as e:
         # Log error but don't fail the order
         print(f"Failed to send WhatsApp notification: {e}")
@@ -145,17 +327,108 @@ def create_guest_order(
     return db_order
 
 
+def _valid_phone(customer_phone: str) -> str:
+    """The E.164 form of ``customer_phone``; 400 when it can't be a phone number."""
+    try:
+        return normalize_phone(customer_phone)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/by-phone", response_model=OrderHistoryPage)
+async def get_orders_by_phone(
+    customer_phone: str,
+    order_number: str = Query(..., description="Number of one of this customer's orders, as proof of ownership"),
+    limit: int = Query(20, ge=1, le=100),
+    before_created_at: Optional[datetime] = Query(None, description="``next_before_created_at`` of the previous page"),
+    before_id: Optional[int] = Query(None, description="``next_before_id`` of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List a customer's orders by phone number, newest first. Phone numbers
+    can be guessed, so the caller must also know one of the customer's
+    order numbers, and only a summary of each order is returned.
+    """
+    normalized_phone = _valid_phone(customer_phone)
+    if (before_created_at is None) != (before_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="before_created_at and before_id must be given together"
+        )
+    
+    # Same answer as an unknown order, so the check can't probe phone numbers
+    if await db.run_sync(find_order_status, order_number, normalized_phone) is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    before = (before_created_at, before_id) if before_id is not None else None
+    orders = await db.run_sync(find_orders_by_phone, normalized_phone, limit, before)
+    last = orders[-1] if len(orders) == limit else None
+    return {
+        "orders": orders,
+        "next_before_created_at": last.created_at if last else None,
+        "next_before_id": last.id if last else None,
+    }
+
+
+async def _read_order_status(order_number: str, customer_phone: str) -> Optional[str]:
+    # Own short session: the caller may then wait without holding a connection
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(find_order_status, order_number, customer_phone)
+
+
+@router.get(
+    "/{order_number}/status",
+    response_model=OrderStatusSnapshot,
+    responses={304: {"description": "Status still equals `known` after `wait` seconds"}}
+)
+async def wait_for_order_status(
+    order_number: str,
+    customer_phone: str,
+    known: Optional[OrderStatus] = Query(None, description="Status the client already has"),
+    wait: float = Query(0, ge=0, le=settings.order_status_max_wait_seconds, description="Seconds to wait for a change")
+):
+    """
+    Get an order's status. With ``known`` and ``wait``, hold the request
+    until the status differs from ``known``, or answer 304 after ``wait``
+    seconds.
+    """
+    _valid_phone(customer_phone)
+    # Register before reading so a change committed in between isn't missed
+    future = order_status_waiters.register(order_number)
+    try:
+        current = await _read_order_status(order_number, customer_phone)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if known is None or current != known or not wait:
+            return {"order_number": order_number, "status": current}
+        
+        try:
+            event = await asyncio.wait_for(future, wait)
+        except asyncio.TimeoutError:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        return {"order_number": order_number, "status": event["status"]}
+    finally:
+        order_status_waiters.unregister(order_number, future)
+
+
+async def _find_order(db: AsyncSession, order_number: str, customer_phone: Optional[str] = None) -> Optional[Order]:
+    order = await db.run_sync(find_order_by_number, order_number, customer_phone)
+    if order is None and is_replica_session(db):
+        # A brand new order may not have reached the replica yet
+        async with AsyncSessionLocal() as primary:
+            order = await primary.run_sync(find_order_by_number, order_number, customer_phone)
+    return order
+
+
 @router.get("/{order_number}", response_model=OrderSchema)
-def get_order_by_number(
+async def get_order_by_number(
     order_number: str,
     customer_phone: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get order by order number and customer phone (for verification)."""
-    order = db.query(Order).filter(
-        Order.order_number == order_number,
-        Order.customer_phone == customer_phone
-    ).first()
+    _valid_phone(customer_phone)
+    order = await _find_order(db, order_number, customer_phone)
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -165,83 +438,313 @@ def get_order_by_number(
 
 # Admin endpoints
 @router.get("/admin/all", response_model=List[OrderSchema])
-def get_all_orders(
+async def get_all_orders(
     skip: int = 0,
     limit: int = 100,
     status: str = None,
     current_admin: Admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all orders (admin only)."""
-    query = db.query(Order)
+    query = select(Order).options(selectinload(Order.order_items))
     
     if status:
-        query = query.filter(Order.status == status)
+        query = query.where(Order.status == status)
     
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    orders = (await db.execute(
+        query.order_by(Order.created_at.desc()).offset(skip).limit(limit)
+    )).scalars().all()
     return orders
 
 
+@router.get("/admin/by-number/{order_number}", response_model=OrderSchema)
+async def get_order_by_number_admin(
+    order_number: str,
+    current_admin: Admin = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get any order, including archived ones, by order number (admin only)."""
+    order = await _find_order(db, order_number)
+    
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    return order
+
+
+@router.post("/admin/archive", status_code=status.HTTP_202_ACCEPTED)
+def archive_old_orders(
+    background_tasks: BackgroundTasks,
+    older_than_days: Optional[int] = Query(None, ge=0, description="Defaults to ARCHIVE_AFTER_DAYS"),
+    current_admin: Admin = Depends(get_current_admin_user)
+):
+    """Move old delivered/cancelled orders to the archive in the background (admin only)."""
+    background_tasks.add_task(run_archive_job, older_than_days)
+    return {"message": "Order archival started"}
+
+
+@router.post("/admin/events/ticket", response_model=StreamTicket)
+async def create_admin_events_ticket(current_admin: Admin = Depends(get_current_admin_user)):
+    """Issue a single-use ticket for opening ``/admin/events`` (admin only)."""
+    return StreamTicket(
+        ticket=create_stream_ticket(current_admin.username),
+        expires_in=settings.event_stream_ticket_seconds
+    )
+
+
+@router.get("/admin/events")
+async def stream_admin_events(
+    request: Request,
+    current_admin: Admin = Depends(get_current_admin_user_from_ticket)
+):
+    """
+    Push new orders and status changes as Server-Sent Events (admin only).
+    EventSource cannot send headers, so pass a ticket from
+    ``POST /admin/events/ticket`` as ``?ticket=``; each ticket opens one stream.
+    """
+    subscription = event_broker.subscribe()
+    
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(settings.event_heartbeat_seconds)
+                # A comment line keeps proxies from closing an idle stream
+                yield format_sse(event) if event is not None else ": keep-alive\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/admin/changes", response_model=OrderChangeFeed)
+async def get_order_changes(
+    since: int = Query(0, ge=0, description="Last seq already applied; 0 for the full history"),
+    limit: int = Query(500, ge=1, le=1000),
+    current_admin: Admin = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Order changes after ``since``, oldest first (admin only).
+    
+    Keep calling with ``next_since`` while ``has_more`` is true. Sequence
+    numbers become visible in order, so nothing is skipped.
+    """
+    changes = await db.run_sync(read_order_changes, since, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    
+    return {
+        "changes": changes,
+        "next_since": changes[-1].seq if changes else since,
+        "has_more": has_more
+    }
+
+
+@router.get("/admin/export")
+def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    start: Optional[date] = Query(None, description="First order day to include"),
+    end: Optional[date] = Query(None, description="Last order day to include"),
+    current_admin: Admin = Depends(get_current_admin_user)
+):
+    """Stream orders and their line items as CSV or NDJSON (admin only)."""
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    filename = f"orders_{start or 'all'}_{end or 'latest'}.{format}"
+    if format == "csv":
+        body, media_type = stream_orders_csv(start, end), "text/csv"
+    else:
+        body, media_type = stream_orders_ndjson(start, end), "application/x-ndjson"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.put("/admin/bulk-status", response_model=BulkOrderStatusResult)
+async def bulk_update_order_status(
+    bulk_update: BulkOrderStatusUpdate,
+    current_admin: Admin = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """Move many orders to one status in a single UPDATE (admin only)."""
+    target = bulk_update.status.value
+    allowed_from = allowed_source_statuses(target)
+    
+    # Lock the selected rows (where supported) so the deltas match the UPDATE
+    orders = (await db.execute(
+        select(
+            Order.id,
+            Order.order_number,
+            Order.customer_name,
+            Order.customer_phone,
+            Order.total_amount,
+            Order.status,
+            Order.created_at
+        ).where(Order.id.in_(bulk_update.order_ids)).with_for_update()
+    )).all()
+    
+    found = {order.id: order for order in orders}
+    skipped = []
+    movable = []
+    for order_id in bulk_update.order_ids:
+        order = found.get(order_id)
+        if order is None:
+            skipped.append({"order_id": order_id, "reason": "not_found"})
+        elif order.status not in allowed_from:
+            reason = "unchanged" if order.status == target else "invalid_transition"
+            skipped.append({"order_id": order_id, "reason": reason, "status": order.status})
+        else:
+            movable.append(order)
+    
+    if movable:
+        await db.execute(
+            update(Order)
+            .where(
+                Order.id.in_([order.id for order in movable]),
+                Order.status.in_(allowed_from)
+            )
+            .values(status=target, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.run_sync(
+            record_bulk_status_change,
+            [(order.status, order.total_amount) for order in movable],
+            target
+        )
+        seqs = [event.seq for event in await db.run_sync(record_bulk_status_events, movable, target)]
+    
+    await db.commit()
+    
+    if movable:
+        publish_orders_status_changed(movable, target, seqs)
+        try:
+            notify_customers_status_change(
+                movable,
+                {order.id: order.status for order in movable},
+                target
+            )
+        except Exception as e:
+            print(f"Failed to queue WhatsApp status updates: {e}")
+    
+    return {
+        "status": target,
+        "updated": [order.id for order in movable],
+        "skipped": skipped
+    }
+
+
 @router.put("/admin/{order_id}", response_model=OrderSchema)
-def update_order_status(
+async def update_order_status(
     order_id: int,
     order_update: OrderUpdate,
     current_admin: Admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Update order status (admin only)."""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Lock the row (where supported) so the stats deltas match the change
+    order = await _load_order(db, order_id, lock=True)
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
     old_status = order.status
+    old_notes = order.notes
     
-    # Update order fields
-    for field, value in order_update.dict(exclude_unset=True).items():
+    # Update order fields; the status is moved separately below
+    changes = order_update.dict(exclude_unset=True)
+    new_status = changes.pop("status", None)
+    for field, value in changes.items():
         setattr(order, field, value)
     
-    db.commit()
-    db.refresh(order)
+    status_seq = None
+    if new_status is not None:
+        new_status = new_status.value
+        # Only move the order away from the status its deltas are based on.
+        # SQLite ignores the row lock, so a concurrent change shows up as no
+        # matching row; the status is read again (now under the write lock)
+        for _ in range(STATUS_UPDATE_ATTEMPTS):
+            if old_status == new_status:
+                break
+            moved = (await db.execute(
+                update(Order)
+                .where(Order.id == order_id, Order.status == old_status)
+                .values(status=new_status, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )).rowcount
+            if moved:
+                set_committed_value(order, "status", new_status)
+                await db.run_sync(record_status_change, old_status, new_status, order.total_amount)
+                status_seq = (await db.run_sync(record_order_event, STATUS_CHANGED, order, old_status)).seq
+                break
+            old_status = (await db.execute(
+                select(Order.status).where(Order.id == order_id)
+            )).scalar_one_or_none()
+            if old_status is None:
+                raise HTTPException(status_code=404, detail="Order not found")
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The order's status keeps changing; reload it and try again"
+            )
+    if order.notes != old_notes:
+        await db.run_sync(record_order_event, NOTES_EDITED, order)
+    
+    await db.commit()
+    order = await _load_order(db, order_id)
     
-    # Send WhatsApp status update to customer if status changed
-    if order_update.status and order_update.status != old_status:
+    # Queue WhatsApp status update to customer if status changed; rapid
+    # successive changes are coalesced so only the latest status is sent
+    if status_seq is not None:
+        publish_order_status_changed(order, old_status, status_seq)
         try:
-            send_order_status_update(order, order_update.status)
+            notify_customer_status_change(order, old_status, new_status)
         except Exception as e:
-            print(f"Failed to send WhatsApp status update: {e}")
+            print(f"Failed to queue WhatsApp status update: {e}")
     
     return order
 
 
 @router.get("/admin/stats")
-def get_order_stats(
+async def get_order_stats(
     current_admin: Admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get order statistics (admin only)."""
-    from sqlalchemy import func
-    
-    # Total orders
-    total_orders = db.query(Order).count()
-    
-    # Orders by status
-    status_counts = db.query(
-        Order.status,
-        func.count(Order.id).label('count')
-    ).group_by(Order.status).all()
-    
-    # Total revenue
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.status.in_(["confirmed", "preparing", "ready", "delivered"])
-    ).scalar() or 0
+    stats = await db.run_sync(read_order_stats)
     
-    # Recent orders
-    recent_orders = db.query(Order).order_by(Order.created_at.desc()).limit(10).all()
+    # Recent orders (ids are assigned in creation order)
+    stats["recent_orders"] = (await db.execute(
+        select(Order)
+        .options(selectinload(Order.order_items))
+        .order_by(Order.id.desc())
+        .limit(10)
+    )).scalars().all()
     
-    return {
-        "total_orders": total_orders,
-        "status_breakdown": {status: count for status, count in status_counts},
-        "total_revenue": total_revenue,
-        "recent_orders": recent_orders
-    }
\ No newline at end of file
+    return stats
+
+
+@router.post("/admin/stats/reconcile")
+async def reconcile_stats(
+    current_admin: Admin = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """Recompute order statistics from scratch and report any drift (admin only)."""
+    drift = await db.run_sync(reconcile_order_stats)
+    return {"drift": drift, "in_sync": not drift}
+
+
+@router.get("/admin/notifications/stats")
+def get_notification_stats(
+    current_admin: Admin = Depends(get_current_admin_user)
+):
+    """Get WhatsApp status notification counters, including coalesced sends (admin only)."""
+    return get_notification_metrics()
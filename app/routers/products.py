@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_read_db, get_write_db
 from app.models.models import Product, Category
 from app.schemas.schemas import (
     Product as ProductSchema,
@@ -17,16 +18,38 @@ from app.utils.dependencies import get_current_admin_user
 router = APIRouter()
 
 
+async def _get_product(db: AsyncSession, product_id: int, active_only: bool = False) -> Optional[Product]:
+    # Categories are serialized with the product, so load them up front
+    query = (
+        select(Product)
+        .options(selectinload(Product.categories))
+        .where(Product.id == product_id)
+        .execution_options(populate_existing=True)
+    )
+    if active_only:
+        query = query.where(Product.is_active == True)
+    return (await db.execute(query)).scalar_one_or_none()
+
+
+async def _get_category(db: AsyncSession, category_id: int, active_only: bool = False) -> Optional[Category]:
+    query = select(Category).where(Category.id == category_id).execution_options(populate_existing=True)
+    if active_only:
+        query = query.where(Category.is_active == True)
+    return (await db.execute(query)).scalar_one_or_none()
+
+
 # Product endpoints
 @router.post("/", response_model=ProductSchema)
-def create_product(
+async def create_product(
     product: ProductCreate,
     current_admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Create a new product (admin only)."""
     # Check if SKU already exists
-    existing_product = db.query(Product).filter(Product.sku == product.sku).first()
+    existing_product = (await db.execute(
+        select(Product.id).where(Product.sku == product.sku)
+    )).first()
     if existing_product:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,19 +69,21 @@ def create_product(
     )
     
     # Add categories
+    categories = []
     if product.category_ids:
-        categories = db.query(Category).filter(Category.id.in_(product.category_ids)).all()
-        db_product.categories = categories
+        categories = (await db.execute(
+            select(Category).where(Category.id.in_(product.category_ids))
+        )).scalars().all()
+    db_product.categories = list(categories)
     
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
     
-    return db_product
+    return await _get_product(db, db_product.id)
 
 
 @router.get("/", response_model=List[ProductSchema])
-def read_products(
+async def read_products(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = Query(None, description="Search in product name and description"),
@@ -66,14 +91,14 @@ def read_products(
     min_price: Optional[float] = Query(None, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, description="Maximum price filter"),
     in_stock: Optional[bool] = Query(None, description="Filter products in stock"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get products with filtering and search."""
-    query = db.query(Product).filter(Product.is_active == True)
+    query = select(Product).options(selectinload(Product.categories)).where(Product.is_active == True)
     
     # Search filter
     if search:
-        query = query.filter(
+        query = query.where(
             or_(
                 Product.name.ilike(f"%{search}%"),
                 Product.description.ilike(f"%{search}%")
@@ -82,31 +107,29 @@ def read_products(
     
     # Category filter
     if category_id:
-        query = query.join(Product.categories).filter(Category.id == category_id)
+        query = query.join(Product.categories).where(Category.id == category_id)
     
     # Price filters
     if min_price is not None:
-        query = query.filter(Product.price >= min_price)
+        query = query.where(Product.price >= min_price)
     if max_price is not None:
-        query = query.filter(Product.price <= max_price)
+        query = query.where(Product.price <= max_price)
     
     # Stock filter
     if in_stock is not None:
         if in_stock:
-            query = query.filter(Product.stock_quantity > 0)
+            query = query.where(Product.stock_quantity > 0)
         else:
-            query = query.filter(Product.stock_quantity == 0)
+            query = query.where(Product.stock_quantity == 0)
     
-    products = query.offset(skip).limit(limit).all()
+    products = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
     return products
 
 
 @router.get("/{product_id}", response_model=ProductSchema)
-def read_product(product_id: int, db: Session = Depends(get_db)):
+async def read_product(product_id: int, db: AsyncSession = Depends(get_db)):
     """Get product by ID."""
-    product = db.query(Product).filter(
-        and_(Product.id == product_id, Product.is_active == True)
-    ).first()
+    product = await _get_product(db, product_id, active_only=True)
     
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -114,14 +137,14 @@ def read_product(product_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{product_id}", response_model=ProductSchema)
-def update_product(
+async def update_product(
     product_id: int,
     product_update: ProductUpdate,
     current_admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Update product (admin only)."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await _get_product(db, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -132,41 +155,44 @@ def update_product(
     
     # Update categories if provided
     if product_update.category_ids is not None:
-        categories = db.query(Category).filter(Category.id.in_(product_update.category_ids)).all()
-        product.categories = categories
+        categories = (await db.execute(
+            select(Category).where(Category.id.in_(product_update.category_ids))
+        )).scalars().all()
+        product.categories = list(categories)
     
-    db.commit()
-    db.refresh(product)
-    return product
+    await db.commit()
+    return await _get_product(db, product_id)
 
 
 @router.delete("/{product_id}")
-def delete_product(
+async def delete_product(
     product_id: int,
     current_admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Delete product (admin only)."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Soft delete by setting is_active to False
     product.is_active = False
-    db.commit()
+    await db.commit()
     return {"message": "Product deleted successfully"}
 
 
 # Category endpoints
 @router.post("/categories/", response_model=CategorySchema)
-def create_category(
+async def create_category(
     category: CategoryCreate,
     current_admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Create a new category (admin only)."""
     # Check if category already exists
-    existing_category = db.query(Category).filter(Category.name == category.name).first()
+    existing_category = (await db.execute(
+        select(Category.id).where(Category.name == category.name)
+    )).first()
     if existing_category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -175,29 +201,29 @@ def create_category(
     
     db_category = Category(name=category.name, description=category.description)
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await db.commit()
+    await db.refresh(db_category)
     
     return db_category
 
 
 @router.get("/categories/", response_model=List[CategorySchema])
-def read_categories(
+async def read_categories(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all categories."""
-    categories = db.query(Category).filter(Category.is_active == True).offset(skip).limit(limit).all()
+    categories = (await db.execute(
+        select(Category).where(Category.is_active == True).offset(skip).limit(limit)
+    )).scalars().all()
     return categories
 
 
 @router.get("/categories/{category_id}", response_model=CategorySchema)
-def read_category(category_id: int, db: Session = Depends(get_db)):
+async def read_category(category_id: int, db: AsyncSession = Depends(get_db)):
     """Get category by ID."""
-    category = db.query(Category).filter(
-        and_(Category.id == category_id, Category.is_active == True)
-    ).first()
+    category = await _get_category(db, category_id, active_only=True)
     
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -205,37 +231,37 @@ def read_category(category_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/categories/{category_id}", response_model=CategorySchema)
-def update_category(
+async def update_category(
     category_id: int,
     category_update: CategoryUpdate,
     current_admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Update category (admin only)."""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await _get_category(db, category_id)
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
     for field, value in category_update.dict(exclude_unset=True).items():
         setattr(category, field, value)
     
-    db.commit()
-    db.refresh(category)
+    await db.commit()
+    await db.refresh(category)
     return category
 
 
 @router.delete("/categories/{category_id}")
-def delete_category(
+async def delete_category(
     category_id: int,
     current_admin = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """Delete category (admin only)."""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
     # Soft delete by setting is_active to False
     category.is_active = False
-    db.commit()
-    return {"message": "Category deleted successfully"}
\ No newline at end of file
+    await db.commit()
+    return {"message": "Category deleted successfully"}
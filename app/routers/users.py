@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_sync_db
 from app.models.models import User
 from app.schemas.schemas import User as UserSchema, UserUpdate
 from app.utils.dependencies import get_current_active_user, get_current_admin_user
@@ -19,7 +19,7 @@ def read_users_me(current_user: User = Depends(get_current_active_user)):
 def update_user_me(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db)
 ):
     """Update current user profile."""
     for field, value in user_update.dict(exclude_unset=True).items():
@@ -35,7 +35,7 @@ def read_users(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db)
 ):
     """Get all users (admin only)."""
     users = db.query(User).offset(skip).limit(limit).all()
@@ -46,7 +46,7 @@ def read_users(
 def read_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db)
 ):
     """Get user by ID (admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -59,7 +59,7 @@ def read_user(
 def delete_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db)
 ):
     """Delete user (admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
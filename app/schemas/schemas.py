@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from app.utils.phone import normalize_phone
 
 
 class OrderStatus(str, Enum):
@@ -174,7 +175,10 @@ class OrderItem(OrderItemBase):
     id: int
     order_id: int
     created_at: datetime
-    product: Product
+    # Product as sold; product_id remains the reference to the live catalog
+    product_name: Optional[str] = None
+    product_sku: Optional[str] = None
+    product_image_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -206,12 +210,44 @@ class GuestOrderCreate(BaseModel):
     session_id: Optional[str] = None  # Optional for session-based cart
     items: Optional[List[OrderItemInput]] = None  # Direct items for frontend
 
+    @validator('customer_phone')
+    def phone_must_be_valid(cls, v):
+        # Orders are looked up by normalized phone, so one placed with a
+        # number that doesn't normalize could never be found again
+        normalize_phone(v)
+        return v
+
 
 class OrderUpdate(BaseModel):
     status: Optional[OrderStatus] = None
     notes: Optional[str] = None
 
 
+class BulkOrderStatusUpdate(BaseModel):
+    order_ids: List[int]
+    status: OrderStatus
+
+    @validator('order_ids')
+    def order_ids_within_limit(cls, v):
+        if not v:
+            raise ValueError('At least one order id is required')
+        if len(v) > 1000:
+            raise ValueError('At most 1000 orders can be updated at once')
+        return list(dict.fromkeys(v))
+
+
+class SkippedOrder(BaseModel):
+    order_id: int
+    reason: str
+    status: Optional[str] = None
+
+
+class BulkOrderStatusResult(BaseModel):
+    status: OrderStatus
+    updated: List[int]
+    skipped: List[SkippedOrder]
+
+
 class Order(BaseModel):
     id: int
     order_number: str
@@ -230,16 +266,75 @@ class Order(BaseModel):
         from_attributes = True
 
 
+class OrderStatusSnapshot(BaseModel):
+    order_number: str
+    status: str
+
+
+class OrderChange(BaseModel):
+    seq: int
+    order_id: int
+    order_number: str
+    event_type: str
+    status: Optional[str] = None
+    old_status: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class OrderSummary(BaseModel):
+    id: int
+    order_number: str
+    status: str
+    total_amount: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class OrderHistoryPage(BaseModel):
+    orders: List[OrderSummary]
+    # Pass back as ``before_created_at`` and ``before_id`` for the next page
+    next_before_created_at: Optional[datetime] = None
+    next_before_id: Optional[int] = None
+
+
+class OrderChangeFeed(BaseModel):
+    changes: List[OrderChange]
+    next_since: int  # Pass back as ``since`` to continue
+    has_more: bool
+
+
 # Authentication Schemas (Admin only)
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class TokenData(BaseModel):
     username: Optional[str] = None
 
 
 class AdminLogin(BaseModel):
     username: str
-    password: str
\ No newline at end of file
+    password: str
+
+# Diagnostics Schemas (Admin only)
+class SqlInstrumentationUpdate(BaseModel):
+    enabled: bool
+
+
+class SqlInstrumentationStatus(BaseModel):
+    enabled: bool
+    worker: int  # Process id of the worker that answered
+    slow_query_ms: float
+    n_plus_one_threshold: int
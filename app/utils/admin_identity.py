@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.models.models import Admin, RevokedToken
+from app.utils.auth import STREAM_TICKET_SCOPE, decode_token
+from app.utils.events import event_broker
+from app.utils.metrics import CACHE_REQUESTS
+
+
+@dataclass(frozen=True)
+class AdminIdentity:
+    """Detached snapshot of an admin, safe to share between requests."""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, admin: Admin) -> "AdminIdentity":
+        return cls(
+            id=admin.id,
+            username=admin.username,
+            email=admin.email,
+            is_active=admin.is_active,
+            created_at=admin.created_at,
+            updated_at=admin.updated_at
+        )
+
+
+class AdminIdentityCache:
+    """LRU cache of resolved admins keyed by token id, each entry with its own expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[AdminIdentity]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() > entry[0]:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                CACHE_REQUESTS.inc(("admin_identity", "miss"))
+                return None
+            self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(("admin_identity", "hit"))
+        return entry[1]
+
+    def set(self, key: str, identity: AdminIdentity, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + min(ttl_seconds, self.ttl_seconds), identity)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_username(self, username: str):
+        with self._lock:
+            for key in [key for key, (_, identity) in self._entries.items() if identity.username == username]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RevokedTokenSet:
+    """This process's view of revoked token ids, pruned once they expire anyway."""
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, exp: float):
+        with self._lock:
+            self._expiry[jti] = exp
+            now = time.time()
+            for expired in [key for key, value in self._expiry.items() if value < now]:
+                del self._expiry[expired]
+
+    def __contains__(self, jti: str) -> bool:
+        with self._lock:
+            return jti in self._expiry
+
+
+admin_identity_cache = AdminIdentityCache(
+    max_entries=settings.admin_cache_max_entries,
+    ttl_seconds=settings.admin_cache_ttl_seconds
+)
+revoked_tokens = RevokedTokenSet()
+
+
+def _cache_key(claims: dict, token: str) -> str:
+    # Tokens issued before jti existed are keyed by the token itself
+    return claims.get("jti") or token
+
+
+def _on_event(event: dict):
+    # Invalidations arrive through the event broker so every worker applies them
+    if event.get("type") == "auth.token_revoked":
+        revoked_tokens.add(event["jti"], event["exp"])
+        admin_identity_cache.invalidate(event["jti"])
+    elif event.get("type") == "auth.admin_changed":
+        admin_identity_cache.invalidate_username(event["username"])
+
+
+event_broker.add_listener(_on_event)
+
+
+async def revoke_token(claims: dict):
+    """Reject a token from now on, in every worker (used by logout)."""
+    jti = claims.get("jti")
+    if jti is None:
+        return
+    table = RevokedToken.__table__
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(delete(table).where(table.c.expires_at < datetime.utcnow()))
+            if (await conn.execute(select(table.c.jti).where(table.c.jti == jti))).first() is None:
+                await conn.execute(insert(table).values(jti=jti, expires_at=datetime.utcfromtimestamp(claims["exp"])))
+    except IntegrityError:
+        pass  # Revoked concurrently
+    # Apply locally right away; the broker relays it to the other workers
+    _on_event({"type": "auth.token_revoked", "jti": jti, "exp": claims["exp"]})
+    event_broker.publish({"type": "auth.token_revoked", "jti": jti, "exp": claims["exp"], "internal": True})
+
+
+def invalidate_admin(username: str):
+    """Drop cached identities for ``username`` after the admin changes (e.g. deactivation)."""
+    admin_identity_cache.invalidate_username(username)
+    event_broker.publish({"type": "auth.admin_changed", "username": username, "internal": True})
+
+
+async def load_admin_identity(claims: dict) -> Optional[AdminIdentity]:
+    """Resolve verified claims against the database."""
+    async with AsyncSessionLocal() as db:
+        jti = claims.get("jti")
+        if jti is not None and await db.get(RevokedToken, jti) is not None:
+            revoked_tokens.add(jti, claims["exp"])
+            return None
+        admin = (await db.execute(
+            select(Admin).where(Admin.username == claims["sub"])
+        )).scalar_one_or_none()
+        return AdminIdentity.from_model(admin) if admin is not None else None
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def resolve_admin(token: str) -> AdminIdentity:
+    """
+    Authenticate a bearer token. Cached tokens skip the database entirely.
+    """
+    credentials_exception = _credentials_exception()
+
+    claims = decode_token(token)
+    # Scoped tokens (stream tickets) are not bearer tokens
+    if claims is None or claims.get("scope") is not None:
+        raise credentials_exception
+    key = _cache_key(claims, token)
+    if key in revoked_tokens:
+        raise credentials_exception
+
+    # Until the broker is listening, revocations and deactivations made by
+    # other workers would go unnoticed, so a cached identity can't be trusted
+    use_cache = event_broker.started
+    identity = admin_identity_cache.get(key) if use_cache else None
+    if identity is None:
+        identity = await load_admin_identity(claims)
+        if identity is None:
+            raise credentials_exception
+        if use_cache:
+            # Never cache past the token's own expiry
+            admin_identity_cache.set(key, identity, claims["exp"] - time.time())
+    return identity
+
+
+async def _redeem_once(claims: dict) -> bool:
+    """Mark a single-use token as spent; False if it already was, in any worker."""
+    table = RevokedToken.__table__
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(table).values(
+                jti=claims["jti"], expires_at=datetime.utcfromtimestamp(claims["exp"])
+            ))
+    except IntegrityError:
+        return False
+    return True
+
+
+async def resolve_stream_ticket(ticket: str) -> AdminIdentity:
+    """Authenticate an event stream ticket (see ``create_stream_ticket``); each works once."""
+    claims = decode_token(ticket)
+    if claims is None or claims.get("scope") != STREAM_TICKET_SCOPE or "jti" not in claims:
+        raise _credentials_exception()
+    identity = await load_admin_identity(claims)
+    if identity is None or not await _redeem_once(claims):
+        raise _credentials_exception()
+    return identity
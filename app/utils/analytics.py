@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+from sqlalchemy import BigInteger, Integer, cast, extract, func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, Product
+from app.utils.events import event_broker
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.order_stats import REVENUE_STATUSES
+
+# NumPy is imported where it's used, so importing the app doesn't load it
+if TYPE_CHECKING:
+    import numpy as np
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+EPOCH_DATE = date(1970, 1, 1)
+EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_seconds(column, dialect_name: str):
+    """SQL expression converting a timestamp column to integer epoch seconds."""
+    if dialect_name == "sqlite":
+        return cast(func.strftime("%s", column), Integer)
+    if dialect_name == "postgresql":
+        return cast(extract("epoch", column), BigInteger)
+    return func.unix_timestamp(column)
+
+
+def _range_bounds(start: date, end: date, utc_offset_hours: int) -> Tuple[datetime, datetime]:
+    # ``end`` is inclusive: the range covers whole local days, stored times are UTC
+    shift = timedelta(hours=utc_offset_hours)
+    return (
+        datetime.combine(start, datetime.min.time()) - shift,
+        datetime.combine(end + timedelta(days=1), datetime.min.time()) - shift
+    )
+
+
+def _load_columns(db: Session, stmt, n_columns: int, dtype) -> np.ndarray:
+    """Stream a query in chunks into a single (rows, n_columns) array."""
+    import numpy as np
+    chunk_size = settings.analytics_chunk_size
+    chunks = []
+    # Core execution on the session's connection skips ORM row processing
+    result = db.connection().execution_options(yield_per=chunk_size).execute(stmt)
+    for partition in result.partitions():
+        # fromiter over the flattened rows avoids NumPy probing each Row object
+        flat = np.fromiter(chain.from_iterable(partition), dtype=dtype, count=len(partition) * n_columns)
+        chunks.append(flat.reshape(-1, n_columns))
+    if not chunks:
+        return np.empty((0, n_columns), dtype=dtype)
+    return np.concatenate(chunks)
+
+
+def _slice_groups(db: Session, range_start: datetime, range_end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Orders grouped per UTC hour and items grouped per product for
+    ``[range_start, range_end)``, as (hours since the epoch, orders, revenue)
+    and (product id, units, revenue) rows.
+    """
+    import numpy as np
+    dialect_name = db.get_bind().dialect.name
+    # Group the hot and archived tables in turn; both feed the same arrays
+    hour_chunks = []
+    product_chunks = []
+    for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        in_range = (
+            order_model.created_at >= range_start,
+            order_model.created_at < range_end,
+            order_model.status.in_(REVENUE_STATUSES)
+        )
+        # Orders per UTC hour: (hours since the epoch, orders, revenue)
+        hour = _epoch_seconds(order_model.created_at, dialect_name) // SECONDS_PER_HOUR
+        hour_chunks.append(_load_columns(
+            db,
+            select(hour, func.count(), func.sum(order_model.total_amount))
+            .where(*in_range)
+            .group_by(hour),
+            3,
+            np.float64
+        ))
+        # Items per product: (product id, units, revenue)
+        product_chunks.append(_load_columns(
+            db,
+            select(
+                item_model.product_id,
+                func.sum(item_model.quantity),
+                func.sum(item_model.quantity * item_model.price)
+            )
+            .join(order_model, order_model.id == item_model.order_id)
+            .where(*in_range)
+            .group_by(item_model.product_id),
+            3,
+            np.float64
+        ))
+    return np.concatenate(hour_chunks), np.concatenate(product_chunks)
+
+
+def _block_bounds(block: int) -> Tuple[datetime, datetime]:
+    block_start = EPOCH + block * timedelta(days=settings.analytics_block_days)
+    return block_start, block_start + timedelta(days=settings.analytics_block_days)
+
+
+def _block_index(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(days=settings.analytics_block_days)
+
+
+def _block_groups(db: Session, block: int) -> Tuple[np.ndarray, np.ndarray]:
+    groups = analytics_block_cache.get(block)
+    if groups is None:
+        generation = analytics_block_cache.generation
+        groups = _slice_groups(db, *_block_bounds(block))
+        analytics_block_cache.set(block, groups, generation)
+    return groups
+
+
+def _range_groups(db: Session, range_start: datetime, range_end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grouped rows for ``[range_start, range_end)``. Whole blocks of
+    ``analytics_block_days`` UTC days come from the block cache, so after an
+    order event only that order's block is grouped again; the partial
+    blocks at either end of the range are grouped directly.
+    """
+    import numpy as np
+    block_length = timedelta(days=settings.analytics_block_days)
+    first_block = -((EPOCH - range_start) // block_length)  # Rounded up
+    end_block = (range_end - EPOCH) // block_length
+    if first_block >= end_block:
+        return _slice_groups(db, range_start, range_end)
+
+    slices = []
+    head_end = _block_bounds(first_block)[0]
+    if range_start < head_end:
+        slices.append(_slice_groups(db, range_start, head_end))
+    slices.extend(_block_groups(db, block) for block in range(first_block, end_block))
+    tail_start = _block_bounds(end_block)[0]
+    if tail_start < range_end:
+        slices.append(_slice_groups(db, tail_start, range_end))
+    # Slices are disjoint and hour aligned, so the rows simply add up
+    return np.concatenate([hours for hours, _ in slices]), np.concatenate([products for _, products in slices])
+
+
+@dataclass
+class SalesAnalytics:
+    """Grouped sales aggregates for one date range."""
+    start: date
+    end: date
+    order_count: int
+    item_count: int
+    total_revenue: float
+    average_order_value: float
+    revenue_by_day: List[dict]
+    revenue_by_hour: List[dict]
+    top_products_by_units: List[dict]
+    top_products_by_revenue: List[dict]
+
+
+def compute_sales_analytics(
+    db: Session,
+    start: date,
+    end: date,
+    utc_offset_hours: int = 0,
+    top_n: int = 10
+) -> SalesAnalytics:
+    """
+    Aggregate orders and order items for the range. The database groups
+    orders per UTC hour and items per product, so only those small grouped
+    results cross the wire (and whole blocks of days are cached); NumPy
+    folds them into days, hours of the day and top products.
+    """
+    import numpy as np
+    range_start, range_end = _range_bounds(start, end, utc_offset_hours)
+    hours, products = _range_groups(db, range_start, range_end)
+
+    # The offset is whole hours, so UTC hour buckets shift straight into local ones
+    local_hour = hours[:, 0].astype(np.int64) + utc_offset_hours
+    hour_orders = hours[:, 1]
+    hour_revenue = hours[:, 2]
+
+    n_days = (end - start).days + 1
+    day_index = local_hour // 24 - (start - EPOCH_DATE).days
+    revenue_by_day = np.bincount(day_index, weights=hour_revenue, minlength=n_days)
+    orders_by_day = np.bincount(day_index, weights=hour_orders, minlength=n_days)
+
+    hour_of_day = local_hour % 24
+    revenue_by_hour = np.bincount(hour_of_day, weights=hour_revenue, minlength=24)
+    orders_by_hour = np.bincount(hour_of_day, weights=hour_orders, minlength=24)
+
+    # A product can appear in both tables; product ids are dense autoincrement
+    # keys, so bincount merges the two without sorting. Drop the ones that
+    # sold nothing
+    item_product_ids = products[:, 0].astype(np.int64)
+    units = np.bincount(item_product_ids, weights=products[:, 1])
+    item_revenue = np.bincount(item_product_ids, weights=products[:, 2])
+    product_ids = np.flatnonzero(units)
+    units = units[product_ids]
+    item_revenue = item_revenue[product_ids]
+
+    top_by_units = _top_indices(units, top_n)
+    top_by_revenue = _top_indices(item_revenue, top_n)
+    wanted_ids = {int(product_ids[i]) for i in np.concatenate([top_by_units, top_by_revenue])}
+    names = dict(
+        db.query(Product.id, Product.name).filter(Product.id.in_(wanted_ids)).all()
+    ) if wanted_ids else {}
+
+    def product_rows(indices):
+        return [
+            {
+                "product_id": int(product_ids[i]),
+                "name": names.get(int(product_ids[i])),
+                "units": int(units[i]),
+                "revenue": round(float(item_revenue[i]), 2)
+            }
+            for i in indices
+        ]
+
+    total_revenue = float(hour_revenue.sum())
+    order_count = int(hour_orders.sum())
+
+    return SalesAnalytics(
+        start=start,
+        end=end,
+        order_count=order_count,
+        item_count=int(units.sum()),
+        total_revenue=round(total_revenue, 2),
+        average_order_value=round(total_revenue / order_count, 2) if order_count else 0.0,
+        revenue_by_day=[
+            {
+                "date": (start + timedelta(days=i)).isoformat(),
+                "orders": int(orders_by_day[i]),
+                "revenue": round(float(revenue_by_day[i]), 2)
+            }
+            for i in range(n_days)
+        ],
+        revenue_by_hour=[
+            {"hour": hour, "orders": int(orders_by_hour[hour]), "revenue": round(float(revenue_by_hour[hour]), 2)}
+            for hour in range(24)
+        ],
+        top_products_by_units=product_rows(top_by_units),
+        top_products_by_revenue=product_rows(top_by_revenue)
+    )
+
+
+def _top_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the ``n`` largest values, largest first."""
+    import numpy as np
+    if len(values) <= n:
+        return np.argsort(values)[::-1]
+    top = np.argpartition(values, -n)[-n:]
+    return top[np.argsort(values[top])[::-1]]
+
+
+class AnalyticsCache:
+    """
+    Small LRU cache of computed analytics.
+
+    ``generation`` advances on every invalidation; a value computed before
+    an invalidation is not stored, since it may predate the change.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                CACHE_REQUESTS.inc((self.name, "miss"))
+                return None
+            self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc((self.name, "hit"))
+        return entry[1]
+
+    def set(self, key, value, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, matches: Callable[[Any], bool]):
+        """Drop the entries whose key ``matches``."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if matches(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+# Results per (start, end, utc_offset_hours, top_n)
+analytics_cache = AnalyticsCache(
+    "analytics",
+    max_entries=settings.analytics_cache_max_entries,
+    ttl_seconds=settings.analytics_cache_ttl_seconds
+)
+# Grouped rows per block of analytics_block_days UTC days (see _range_groups)
+analytics_block_cache = AnalyticsCache(
+    "analytics_block",
+    max_entries=settings.analytics_block_cache_max_entries,
+    ttl_seconds=settings.analytics_block_cache_ttl_seconds
+)
+
+
+def _event_time(event: dict) -> Optional[datetime]:
+    """The order's ``created_at`` as naive UTC, matching the range bounds."""
+    try:
+        moment = datetime.fromisoformat(event["created_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _range_contains(key, moment: datetime) -> bool:
+    range_start, range_end = _range_bounds(*key[:3])
+    return range_start <= moment < range_end
+
+
+def _on_event(event: dict):
+    # New orders and status changes from any worker make the cached ranges
+    # (and the block) holding the order's creation time stale
+    if event.get("type") not in ("order.created", "order.status_changed"):
+        return
+    moment = _event_time(event)
+    if moment is None:
+        analytics_block_cache.clear()
+        analytics_cache.clear()
+        return
+    block = _block_index(moment)
+    analytics_block_cache.invalidate(lambda key: key == block)
+    analytics_cache.invalidate(lambda key: _range_contains(key, moment))
+
+
+event_broker.add_listener(_on_event)
+
+
+def get_sales_analytics(
+    db: Session,
+    start: date,
+    end: date,
+    utc_offset_hours: int = 0,
+    top_n: int = 10
+) -> SalesAnalytics:
+    """
+    Return analytics for the range. Cached until the TTL runs out or an
+    order created within the range is placed or changes status.
+    """
+    key = (start, end, utc_offset_hours, top_n)
+    analytics = analytics_cache.get(key)
+    if analytics is None:
+        generation = analytics_cache.generation
+        analytics = compute_sales_analytics(db, start, end, utc_offset_hours, top_n)
+        analytics_cache.set(key, analytics, generation)
+    return analytics
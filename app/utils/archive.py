@@ -0,0 +1,153 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Union
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session, selectinload
+from app.config import settings
+from app.database import SessionLocal
+from app.models.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from app.utils.phone import try_normalize_phone
+
+logger = logging.getLogger(__name__)
+
+# Orders in these statuses never change again and can leave the hot tables
+ARCHIVABLE_STATUSES = ("delivered", "cancelled")
+
+ORDER_COLUMNS = [column.name for column in Order.__table__.columns]
+ORDER_ITEM_COLUMNS = [column.name for column in OrderItem.__table__.columns]
+
+
+def archive_orders(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Move finished orders whose last change is older than the cutoff into
+    the archive tables, one committed batch at a time.
+
+    Returns the number of orders archived.
+    """
+    older_than_days = settings.archive_after_days if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    orders = Order.__table__
+    items = OrderItem.__table__
+    archived_orders = ArchivedOrder.__table__
+    archived_items = ArchivedOrderItem.__table__
+
+    total = 0
+    while True:
+        ids = db.execute(
+            select(orders.c.id)
+            .where(
+                orders.c.status.in_(ARCHIVABLE_STATUSES),
+                func.coalesce(orders.c.updated_at, orders.c.created_at) < cutoff
+            )
+            .order_by(orders.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        db.execute(insert(archived_orders).from_select(
+            ORDER_COLUMNS,
+            select(*[orders.c[name] for name in ORDER_COLUMNS]).where(orders.c.id.in_(ids))
+        ))
+        db.execute(insert(archived_items).from_select(
+            ORDER_ITEM_COLUMNS,
+            select(*[items.c[name] for name in ORDER_ITEM_COLUMNS]).where(items.c.order_id.in_(ids))
+        ))
+        db.execute(delete(items).where(items.c.order_id.in_(ids)))
+        db.execute(delete(orders).where(orders.c.id.in_(ids)))
+        db.commit()
+
+        total += len(ids)
+        logger.info(f"Archived {len(ids)} orders (total {total})")
+
+    return total
+
+
+def run_archive_job(older_than_days: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+    """Run ``archive_orders`` with its own session (for background tasks and scripts)."""
+    db = SessionLocal()
+    try:
+        return archive_orders(db, older_than_days, batch_size)
+    except Exception as e:
+        logger.error(f"Order archival failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def _phone_matches(model, customer_phone: str):
+    # Match however the phone was typed; fall back to the raw text for
+    # rows the backfill couldn't normalize
+    normalized_phone = try_normalize_phone(customer_phone)
+    if normalized_phone is None:
+        # Comparing with None would render as IS NULL and match every row
+        # the backfill left unnormalized
+        return model.customer_phone == customer_phone
+    return or_(
+        model.customer_phone_normalized == normalized_phone,
+        model.customer_phone == customer_phone
+    )
+
+
+def find_order_by_number(
+    db: Session,
+    order_number: str,
+    customer_phone: Optional[str] = None
+) -> Optional[Union[Order, ArchivedOrder]]:
+    """Look an order up in the hot table, falling back to the archive."""
+    for model in (Order, ArchivedOrder):
+        query = db.query(model).options(selectinload(model.order_items)).filter(
+            model.order_number == order_number
+        )
+        if customer_phone is not None:
+            query = query.filter(_phone_matches(model, customer_phone))
+        order = query.first()
+        if order is not None:
+            return order
+    return None
+
+
+def find_order_status(db: Session, order_number: str, customer_phone: str) -> Optional[str]:
+    """Just the status of an order, without loading it or its items."""
+    for model in (Order, ArchivedOrder):
+        status = db.query(model.status).filter(
+            model.order_number == order_number,
+            _phone_matches(model, customer_phone)
+        ).scalar()
+        if status is not None:
+            return status
+    return None
+
+
+def find_orders_by_phone(
+    db: Session,
+    normalized_phone: str,
+    limit: int,
+    before: Optional[Tuple[datetime, int]] = None
+) -> List[Union[Order, ArchivedOrder]]:
+    """
+    A customer's most recent orders, newest first, across the hot table
+    and the archive. Pass the ``(created_at, id)`` of the last order seen
+    as ``before`` to page further back.
+    """
+    orders = []
+    for model in (Order, ArchivedOrder):
+        query = db.query(model).filter(model.customer_phone_normalized == normalized_phone)
+        if before is not None:
+            created_at, order_id = before
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < order_id)
+            ))
+        orders.extend(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit).all())
+    # Orders are archived by last change, not creation, so the two tables
+    # interleave in time; archived rows keep their ids, so (created_at, id)
+    # orders both tables consistently
+    orders.sort(key=lambda order: (order.created_at, order.id), reverse=True)
+    return orders[:limit]
@@ -1,43 +1,105 @@
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# jose and passlib are imported on first use so they don't slow down app startup
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password checks are already running or queued."""
+
+
+# bcrypt is deliberately slow; a small dedicated pool keeps a burst of
+# logins from taking over the threads that serve everything else
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
+_password_slots = threading.BoundedSemaphore(settings.password_hash_workers + settings.password_hash_max_queued)
+
+
+async def _run_password_job(fn, *args):
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+    finally:
+        _password_slots.release()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Run ``verify_password`` on the password pool. Raises PasswordHasherBusy when it is full."""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Run ``get_password_hash`` on the password pool. Raises PasswordHasherBusy when it is full."""
+    return await _run_password_job(get_password_hash, password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for caching and revocation
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return username."""
+# Scope of the single-use tickets that open the admin event stream; they
+# travel in the URL, so they must never work as bearer tokens
+STREAM_TICKET_SCOPE = "event_stream"
+
+
+def create_stream_ticket(username: str) -> str:
+    """Short-lived, single-use credential for ``EventSource``, which cannot send headers."""
+    return create_access_token(
+        {"sub": username, "scope": STREAM_TICKET_SCOPE},
+        expires_delta=timedelta(seconds=settings.event_stream_ticket_seconds)
+    )
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Verify a JWT's signature and expiry and return its claims."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    if payload.get("sub") is None:
+        return None
+    return payload
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT token and return username."""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import settings
+from app.utils.metrics import Counter, Gauge, register_collector
+
+
+class PoolMetrics:
+    """Checkout counters for one connection pool, shared across its recreations."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def record_timeout(self, waited: float):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            checkouts = self.checkouts
+            metrics = {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / checkouts, 6) if checkouts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+        checked_out = pool.checkedout()
+        metrics.update(
+            size=pool.size(),
+            checked_out=checked_out,
+            overflow=max(pool.overflow(), 0),
+            capacity=self.capacity,
+            saturation=round(checked_out / self.capacity, 3) if self.capacity else 0.0
+        )
+        return metrics
+
+
+class _TimedCheckout:
+    """Pool mixin timing how long each checkout waits (including connecting)."""
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+_instrumented: Dict[str, Engine] = {}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def pool_options(url, async_driver: bool = False) -> dict:
+    """
+    ``create_engine`` keyword arguments for the configured pool. In-memory
+    SQLite keeps SQLAlchemy's single-connection pool.
+    """
+    if _is_memory_sqlite(make_url(url)):
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if async_driver else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def instrument_pool(engine: Engine, name: str):
+    """Collect checkout metrics for ``engine`` (a sync engine, or ``async_engine.sync_engine``)."""
+    if isinstance(engine.pool, _TimedCheckout):
+        engine.pool.metrics = PoolMetrics(capacity=settings.db_pool_size + settings.db_max_overflow)
+        _instrumented[name] = engine
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """The per-connection SQLite performance profile."""
+    return {
+        # Readers no longer block behind a writer, and commits only append to the WAL
+        "journal_mode": settings.sqlite_journal_mode,
+        # NORMAL is durable across application crashes in WAL mode; only power loss can roll back
+        "synchronous": settings.sqlite_synchronous,
+        # Wait for the write lock instead of failing with "database is locked"
+        "busy_timeout": str(settings.sqlite_busy_timeout_ms),
+        # Negative sizes are in KiB
+        "cache_size": str(-settings.sqlite_cache_size_kb),
+        "mmap_size": str(settings.sqlite_mmap_size_mb * 1024 * 1024),
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine):
+    """Apply the pragma profile to every new connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def get_pool_metrics() -> dict:
+    """Checkout wait and saturation of each instrumented pool."""
+    return {
+        name: engine.pool.metrics.snapshot(engine.pool)
+        for name, engine in _instrumented.items()
+    }
+
+
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool.", ("pool",))
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection.", ("pool",))
+DB_POOL_WAIT = Counter("db_pool_wait_seconds_total", "Time spent waiting for pool checkouts.", ("pool",))
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out.", ("pool",))
+DB_POOL_SATURATION = Gauge("db_pool_saturation", "Checked-out connections over pool size plus overflow.", ("pool",))
+
+
+def _collect_pool_metrics():
+    for name, stats in get_pool_metrics().items():
+        yield DB_POOL_CHECKOUTS, (name,), stats["checkouts"]
+        yield DB_POOL_TIMEOUTS, (name,), stats["timeouts"]
+        yield DB_POOL_WAIT, (name,), stats["wait_seconds_total"]
+        yield DB_POOL_CHECKED_OUT, (name,), stats["checked_out"]
+        yield DB_POOL_SATURATION, (name,), stats["saturation"]
+
+
+register_collector(_collect_pool_metrics)
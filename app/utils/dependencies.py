@@ -1,34 +1,59 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.models import Admin
-from app.utils.auth import verify_token
+from app.config import settings
+from app.utils.admin_identity import AdminIdentity, resolve_admin, resolve_stream_ticket
+from app.utils.auth import decode_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/admin/login")
 
 
-async def get_current_admin(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_admin(token: str = Depends(oauth2_scheme)) -> AdminIdentity:
     """Get current authenticated admin."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    username = verify_token(token)
-    if username is None:
-        raise credentials_exception
-    
-    admin = db.query(Admin).filter(Admin.username == username).first()
-    if admin is None:
-        raise credentials_exception
-    
-    return admin
-
-
-async def get_current_admin_user(current_admin: Admin = Depends(get_current_admin)):
+    return await resolve_admin(token)
+
+
+async def get_current_admin_user(current_admin: AdminIdentity = Depends(get_current_admin)) -> AdminIdentity:
     """Get current active admin user."""
     if not current_admin.is_active:
         raise HTTPException(status_code=400, detail="Inactive admin account")
-    return current_admin
\ No newline at end of file
+    return current_admin
+
+
+async def get_current_admin_user_from_ticket(
+    ticket: str = Query(..., description="Single-use stream ticket")
+) -> AdminIdentity:
+    """
+    Authenticate a long-lived stream such as EventSource, which cannot send
+    headers. The URL (and so access logs) only ever carries a short-lived,
+    already spent ticket, never the access token.
+    """
+    return await get_current_admin_user(await resolve_stream_ticket(ticket))
+
+
+async def get_token_claims(
+    token: str = Depends(oauth2_scheme),
+    current_admin: AdminIdentity = Depends(get_current_admin_user)
+) -> dict:
+    """Claims of the current admin's access token (e.g. to revoke it)."""
+    return decode_token(token)
+
+
+LOOPBACK_HOSTS = {"127.0.0.1", "::1"}
+
+
+async def require_metrics_access(request: Request, authorization: Optional[str] = Header(None)):
+    """
+    Guard /metrics, which exposes connection pool and threadpool gauges.
+    Scrapers send METRICS_TOKEN as a bearer token; without a token
+    configured, only direct (unproxied) loopback scrapes are allowed.
+    """
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}".encode("utf-8")
+        if not hmac.compare_digest((authorization or "").encode("utf-8"), expected):
+            raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        return
+    client = request.client
+    if client is None or client.host not in LOOPBACK_HOSTS or "x-forwarded-for" in request.headers:
+        raise HTTPException(status_code=403, detail="Set METRICS_TOKEN to scrape /metrics remotely")
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sent to a subscriber that fell too far behind; the client should reload
+RESYNC_EVENT = {"type": "resync"}
+
+
+class EventBackend:
+    """
+    Transport that carries published events to every process.
+
+    ``start`` is called once with the callback that fans an event out to
+    this process's subscribers; ``publish`` must eventually invoke that
+    callback in every process, including this one.
+    """
+
+    def start(self, deliver: Callable[[dict], None]):
+        raise NotImplementedError
+
+    def publish(self, event: dict):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class LocalEventBackend(EventBackend):
+    """Delivers events within this process only (single worker, tests)."""
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver: Callable[[dict], None]):
+        self._deliver = deliver
+
+    def publish(self, event: dict):
+        if self._deliver is not None:
+            self._deliver(event)
+
+
+class RedisEventBackend(EventBackend):
+    """
+    Relays events between workers through a Redis pub/sub channel.
+
+    Events are published from request handlers on the event loop, so
+    ``publish`` only queues them; a sender thread makes the Redis calls.
+    If Redis is slow or down, events beyond ``outbox_size`` are dropped
+    rather than blocking requests.
+    """
+
+    def __init__(self, url: str, channel: str, outbox_size: int = 10_000):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("EVENT_BACKEND=redis requires the 'redis' package")
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._thread = None
+        self._outbox: queue.Queue = queue.Queue(maxsize=outbox_size)
+        self._sender = threading.Thread(target=self._send_loop, name="event-publisher", daemon=True)
+        self._sender.start()
+
+    def start(self, deliver: Callable[[dict], None]):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: lambda message: deliver(json.loads(message["data"]))})
+        self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publish(self, event: dict):
+        try:
+            self._outbox.put_nowait(json.dumps(event))
+        except queue.Full:
+            logger.error(f"Event outbox full, dropped {event.get('type')} event")
+
+    def _send_loop(self):
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            try:
+                self._client.publish(self.channel, message)
+            except Exception as e:
+                logger.error(f"Failed to publish event to Redis: {str(e)}")
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+        # Let queued events go out before the process exits
+        try:
+            self._outbox.put(None, timeout=1.0)
+        except queue.Full:
+            return
+        self._sender.join(timeout=5.0)
+
+
+class Subscription:
+    """
+    One connected client's bounded event queue.
+
+    Events are published from worker threads and consumed on the event
+    loop, so they are handed over with ``call_soon_threadsafe``. A client
+    that falls more than ``max_queue`` events behind gets a single resync
+    event instead of the backlog.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=max_queue)
+
+    def put(self, event: dict):
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next event, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """In-process fan-out of order events to connected admin clients."""
+
+    def __init__(self, backend: EventBackend, max_queue: int):
+        self.backend = backend
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._listeners: List[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """
+        Start receiving events from the backend. Called at application
+        startup, so listeners hear other workers' events before this worker
+        publishes or serves a subscriber of its own; later calls do nothing.
+        """
+        with self._lock:
+            if self._started:
+                return
+            # Only marked started once the backend is up, so a failed start is retried
+            self.backend.start(self._deliver)
+            self._started = True
+
+    @property
+    def started(self) -> bool:
+        """Whether events published by other workers reach this process."""
+        return self._started
+
+    def _deliver(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            listeners = list(self._listeners)
+        # Internal events (cache invalidation etc.) are not for clients
+        if not event.get("internal"):
+            for subscription in subscribers:
+                subscription.put(event)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Order event listener failed: {str(e)}")
+
+    def publish(self, event: dict):
+        """Send ``event`` to every subscriber in every process. Never raises."""
+        self.start()
+        try:
+            self.backend.publish(event)
+        except Exception as e:
+            logger.error(f"Failed to publish {event.get('type')} event: {str(e)}")
+
+    def subscribe(self) -> Subscription:
+        """Register a subscriber for the running event loop."""
+        self.start()
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """Call ``listener(event)`` for every event, on the delivering thread."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def stop(self):
+        self.backend.stop()
+
+
+def create_event_backend() -> EventBackend:
+    if settings.event_backend == "redis":
+        return RedisEventBackend(settings.event_redis_url, settings.event_redis_channel)
+    return LocalEventBackend()
+
+
+event_broker = EventBroker(create_event_backend(), max_queue=settings.event_queue_size)
+
+
+class OrderStatusWaiters:
+    """
+    Requests parked until a given order's status changes.
+
+    Fed by the event broker, so a status change committed by any worker
+    wakes the waiters in every worker.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, order_number: str) -> asyncio.Future:
+        """Future resolved with the next status event for ``order_number``."""
+        waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+        with self._lock:
+            self._waiters.setdefault(order_number, set()).add(waiter)
+        return waiter[1]
+
+    def unregister(self, order_number: str, future: asyncio.Future):
+        with self._lock:
+            waiters = self._waiters.get(order_number)
+            if not waiters:
+                return
+            waiters.difference_update({waiter for waiter in waiters if waiter[1] is future})
+            if not waiters:
+                del self._waiters[order_number]
+
+    def on_event(self, event: dict):
+        if event.get("type") != "order.status_changed":
+            return
+        with self._lock:
+            waiters = self._waiters.pop(event["order_number"], set())
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, event)
+
+    @property
+    def waiting_count(self) -> int:
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
+
+
+def _resolve(future: asyncio.Future, event: dict):
+    if not future.done():
+        future.set_result(event)
+
+
+order_status_waiters = OrderStatusWaiters()
+event_broker.add_listener(order_status_waiters.on_event)
+
+
+def order_event(
+    event_type: str,
+    order,
+    old_status: Optional[str] = None,
+    seq: Optional[int] = None
+) -> dict:
+    """Compact event payload for an order; ``seq`` is its order change log position."""
+    return {
+        "type": event_type,
+        "seq": seq,
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "customer_name": order.customer_name,
+        "status": getattr(order.status, "value", order.status),
+        "old_status": getattr(old_status, "value", old_status),
+        "total_amount": order.total_amount,
+        "created_at": order.created_at.isoformat() if order.created_at else None
+    }
+
+
+def publish_order_created(order, seq: Optional[int] = None):
+    """Announce a committed new order."""
+    event_broker.publish(order_event("order.created", order, seq=seq))
+
+
+def publish_order_status_changed(order, old_status: str, seq: Optional[int] = None):
+    """Announce a committed status change."""
+    event_broker.publish(order_event("order.status_changed", order, old_status, seq))
+
+
+def publish_orders_status_changed(orders, new_status: str, seqs: Optional[List[int]] = None):
+    """Announce a committed bulk status change; ``orders`` carry their old status."""
+    for index, order in enumerate(orders):
+        event = order_event("order.status_changed", order, order.status, seqs[index] if seqs else None)
+        event["status"] = new_status
+        event_broker.publish(event)
+
+
+def format_sse(event: dict) -> str:
+    """
+    Encode an event as a Server-Sent Events message. The change log
+    sequence becomes the SSE id, so a reconnecting client knows where to
+    resume from.
+    """
+    event_id = f"id: {event['seq']}\n" if event.get("seq") is not None else ""
+    return f"{event_id}event: {event['type']}\ndata: {json.dumps(event)}\n\n"
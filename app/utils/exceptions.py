@@ -1,4 +1,5 @@
 from fastapi import Request, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -24,7 +25,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "error": True,
             "message": exc.detail,
             "status_code": exc.status_code
-        }
+        },
+        # Keep Retry-After, WWW-Authenticate etc.
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -45,7 +48,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={
             "error": True,
             "message": "Validation error",
-            "details": exc.errors(),
+            # Validator errors carry the raised exception object in their context
+            "details": jsonable_encoder(exc.errors()),
             "status_code": 422
         }
     )
@@ -0,0 +1,175 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import engine
+from app.models.models import IdempotencyKey
+
+# How often a waiter re-checks the database for a result produced by another worker
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used with a different request body."""
+
+
+class IdempotencyInProgress(Exception):
+    """The original request is still running after the wait timeout."""
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+
+
+def request_fingerprint(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Database-backed idempotency keys with a TTL.
+
+    The first request for a key claims it by inserting a row; the primary
+    key makes the claim atomic across workers. The owner stores its
+    response in the same transaction as its effects, so once those commit
+    the key can only be replayed, never taken over. Later requests either
+    replay the stored response bytes or, while the original is still
+    running, wait for it: same-process waiters are woken by an event,
+    other workers poll the row. A failed original releases the key so
+    the client can retry.
+    """
+
+    def __init__(self, ttl_seconds: float, lock_seconds: float, wait_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self._events: Dict[str, threading.Event] = {}
+        self._events_lock = threading.Lock()
+        self._claims = 0
+
+    def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Claim ``key`` or wait for its result.
+
+        Returns None when the caller owns the key and must run the request,
+        or the stored response to replay.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            if self._try_claim(key, fingerprint):
+                return None
+
+            row = self._load(key)
+            if row is None:
+                # Released or expired between our insert and select
+                time.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            if row.fingerprint != fingerprint:
+                raise IdempotencyKeyMismatch(key)
+            if row.status_code is not None:
+                return StoredResponse(status_code=row.status_code, body=row.response_body)
+            if row.locked_until < datetime.utcnow():
+                # The original worker died mid-request; take the key over
+                self._delete(key, only_if_locked_before=datetime.utcnow())
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgress(key)
+            self._wait_local(key, min(remaining, POLL_INTERVAL_SECONDS))
+
+    def store_response(self, db: Session, key: str, response: StoredResponse):
+        """
+        Store the response of the request that owns ``key`` in ``db``'s
+        transaction, which must be the one committing the request's effects.
+        Call ``notify`` once it has committed.
+        """
+        db.execute(
+            update(IdempotencyKey.__table__)
+            .where(IdempotencyKey.__table__.c.key == key)
+            .values(status_code=response.status_code, response_body=response.body)
+        )
+
+    def release(self, key: str):
+        """Forget ``key`` after the owning request failed so it can be retried."""
+        self._delete(key, only_if_pending=True)
+        self.notify(key)
+
+    def _try_claim(self, key: str, fingerprint: str) -> bool:
+        now = datetime.utcnow()
+        try:
+            with engine.begin() as conn:
+                conn.execute(IdempotencyKey.__table__.insert().values(
+                    key=key,
+                    fingerprint=fingerprint,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                    locked_until=now + timedelta(seconds=self.lock_seconds)
+                ))
+        except IntegrityError:
+            return False
+
+        with self._events_lock:
+            self._events[key] = threading.Event()
+            self._claims += 1
+            purge = self._claims % 100 == 0
+        if purge:
+            self.purge_expired()
+        return True
+
+    def _load(self, key: str):
+        table = IdempotencyKey.__table__
+        with engine.connect() as conn:
+            row = conn.execute(select(table).where(table.c.key == key)).first()
+        if row is not None and row.expires_at < datetime.utcnow():
+            self._delete(key)
+            return None
+        return row
+
+    def _delete(self, key: str, only_if_locked_before: Optional[datetime] = None, only_if_pending: bool = False):
+        table = IdempotencyKey.__table__
+        stmt = delete(table).where(table.c.key == key)
+        if only_if_locked_before is not None:
+            stmt = stmt.where(table.c.locked_until < only_if_locked_before, table.c.status_code.is_(None))
+        elif only_if_pending:
+            # A stored response means the request's effects committed
+            stmt = stmt.where(table.c.status_code.is_(None))
+        with engine.begin() as conn:
+            conn.execute(stmt)
+
+    def _wait_local(self, key: str, timeout: float):
+        with self._events_lock:
+            event = self._events.get(key)
+        if event is not None:
+            event.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def notify(self, key: str):
+        """Wake this process's requests waiting for ``key``."""
+        with self._events_lock:
+            event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def purge_expired(self) -> int:
+        """Delete expired keys. Returns the number removed."""
+        table = IdempotencyKey.__table__
+        with engine.begin() as conn:
+            result = conn.execute(delete(table).where(table.c.expires_at < datetime.utcnow()))
+        return result.rowcount
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    lock_seconds=settings.idempotency_lock_seconds,
+    wait_seconds=settings.idempotency_wait_seconds
+)
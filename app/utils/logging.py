@@ -1,28 +1,117 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-
-# Create logs directory if it doesn't exist
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(f"logs/app_{datetime.now().strftime('%Y%m%d')}.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from app.config import settings
 
 # Create logger
 logger = logging.getLogger("ecommerce_api")
 
+# One JSON record per request, written to its own file (see middleware.py)
+access_logger = logging.getLogger("ecommerce_api.access")
+access_logger.propagate = False
+
+_listener = None
+_queue_handler = None
+_configure_lock = threading.Lock()
+
+
+def _is_access_record(record: logging.LogRecord) -> bool:
+    return record.name == access_logger.name
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record's ``fields`` as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """
+    Route all records through a queue so request handlers never wait on
+    disk or console I/O; a background listener thread writes them to the
+    size-rotated app and access logs and to stdout. Runs at application
+    startup, or on the first log call outside the app.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    with _configure_lock:
+        if _listener is not None:
+            return
+        # Create logs directory if it doesn't exist
+        logs_dir = Path(settings.log_dir)
+        logs_dir.mkdir(parents=True, exist_ok=True)
+
+        text_format = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        app_file = logging.handlers.RotatingFileHandler(
+            logs_dir / "app.log",
+            maxBytes=settings.log_max_bytes,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8"
+        )
+        app_file.setFormatter(text_format)
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(text_format)
+        access_file = logging.handlers.RotatingFileHandler(
+            logs_dir / "access.log",
+            maxBytes=settings.log_max_bytes,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8"
+        )
+        access_file.setFormatter(JsonFormatter())
+        # Access records only go to the access log; everything else skips it
+        access_file.addFilter(_is_access_record)
+        app_file.addFilter(lambda record: not _is_access_record(record))
+        console.addFilter(lambda record: not _is_access_record(record))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(queue_handler)
+        access_logger.setLevel(logging.INFO)
+        access_logger.addHandler(queue_handler)
+
+        listener = logging.handlers.QueueListener(log_queue, app_file, console, access_file)
+        listener.start()
+        _listener, _queue_handler = listener, queue_handler
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the listener thread."""
+    global _listener, _queue_handler
+    with _configure_lock:
+        listener, handler = _listener, _queue_handler
+        _listener = _queue_handler = None
+        if handler is not None:
+            logging.getLogger().removeHandler(handler)
+            access_logger.removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+
+
+def log_access(level: int, fields: dict):
+    """Queue one structured access record."""
+    configure_logging()
+    access_logger.log(level, "access", extra={"fields": fields})
+
 
 def log_info(message: str, extra_data: dict = None):
     """Log info message with optional extra data."""
+    configure_logging()
     if extra_data:
         logger.info(f"{message} | Data: {extra_data}")
     else:
@@ -31,6 +120,7 @@ def log_info(message: str, extra_data: dict = None):
 
 def log_error(message: str, error: Exception = None, extra_data: dict = None):
     """Log error message with optional exception and extra data."""
+    configure_logging()
     error_msg = message
     if error:
         error_msg += f" | Error: {str(error)}"
@@ -41,6 +131,7 @@ def log_error(message: str, error: Exception = None, extra_data: dict = None):
 
 def log_warning(message: str, extra_data: dict = None):
     """Log warning message with optional extra data."""
+    configure_logging()
     if extra_data:
         logger.warning(f"{message} | Data: {extra_data}")
     else:
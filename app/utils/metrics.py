@@ -0,0 +1,264 @@
+"""
+Prometheus metrics without a client library.
+
+Counters and histograms are recorded into per-thread shards: each thread
+only ever writes its own dict, so recording takes no lock and costs a
+dict update. Scrapes sum the shards. Gauges are computed at scrape time
+by collectors.
+
+With METRICS_DIR set, every worker process also writes its totals to
+``<METRICS_DIR>/worker-<pid>.json`` every METRICS_WRITE_INTERVAL_SECONDS,
+and a scrape of any worker adds up the files of all the others. Counters
+of exited workers keep counting towards the totals; their gauges are
+dropped. Clear the directory when deploying.
+"""
+import asyncio
+import json
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+from app.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+_metrics: Dict[str, "_Metric"] = {}
+_collectors: List[Callable[[], Iterable[Tuple["_Metric", tuple, float]]]] = []
+
+# Every thread's shard, kept after the thread exits so its counts aren't lost
+_shards: List[dict] = []
+_local = threading.local()
+
+
+def _shard() -> dict:
+    try:
+        return _local.values
+    except AttributeError:
+        values = _local.values = {}
+        _shards.append(values)
+        return values
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        _metrics[name] = self
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        """``labels`` are the values for ``labelnames``, in order."""
+        shard = _shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple, value: float):
+        shard = _shard()
+        key = (self.name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # One count per bucket plus +Inf (not cumulative), then the sum
+            counts = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class Gauge(_Metric):
+    """Set only by collectors at scrape time; labelled with the worker's pid."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames + ("worker",))
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[_Metric, tuple, float]]]):
+    """
+    ``collector()`` yields ``(metric, labels, value)`` at scrape time, for
+    state that already lives elsewhere (pool stats, existing counters).
+    """
+    _collectors.append(collector)
+
+
+def _add(totals: dict, key, value):
+    if isinstance(value, list):
+        current = totals.get(key)
+        totals[key] = value if current is None else [a + b for a, b in zip(current, value)]
+    else:
+        totals[key] = totals.get(key, 0.0) + value
+
+
+def _local_samples() -> dict:
+    """This worker's counters, histograms and gauges, keyed by (name, labels)."""
+    worker = str(os.getpid())
+    totals = {}
+    for shard in list(_shards):
+        for key, value in list(shard.items()):
+            _add(totals, key, list(value) if isinstance(value, list) else value)
+    for collector in _collectors:
+        for metric, labels, value in collector():
+            if metric.type == "gauge":
+                labels = labels + (worker,)
+            _add(totals, (metric.name, labels), value)
+    return totals
+
+
+def _worker_file(pid: int) -> Path:
+    return Path(settings.metrics_dir) / f"worker-{pid}.json"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def write_worker_snapshot(samples: dict):
+    """Publish this worker's totals for the other workers' scrapes."""
+    path = _worker_file(os.getpid())
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps([[name, list(labels), value] for (name, labels), value in samples.items()]))
+    os.replace(tmp_path, path)
+
+
+def _other_workers_samples() -> dict:
+    totals = {}
+    own_pid = os.getpid()
+    for path in Path(settings.metrics_dir).glob("worker-*.json"):
+        pid = int(path.stem.split("-", 1)[1])
+        if pid == own_pid:
+            continue
+        try:
+            samples = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue  # Being replaced right now; counted on the next scrape
+        alive = _pid_alive(pid)
+        for name, labels, value in samples:
+            metric = _metrics.get(name)
+            if metric is None or (metric.type == "gauge" and not alive):
+                continue
+            _add(totals, (name, tuple(labels)), value)
+    return totals
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render(samples: dict) -> str:
+    """Prometheus text exposition of ``samples``."""
+    by_metric: Dict[str, list] = {}
+    for (name, labels), value in samples.items():
+        by_metric.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(by_metric):
+        metric = _metrics.get(name)
+        if metric is None:
+            continue
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        for labels, value in sorted(by_metric[name]):
+            if metric.type != "histogram":
+                lines.append(f"{name}{_label_text(metric.labelnames, labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float("inf"),), value[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _label_text(metric.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(metric.labelnames, labels)} {value[-1]}")
+            lines.append(f"{name}_count{_label_text(metric.labelnames, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+async def render_metrics() -> str:
+    """Body of the /metrics endpoint (call from the event loop)."""
+    samples = _local_samples()  # Collectors may need the running loop
+    if not settings.metrics_dir:
+        return render(samples)
+
+    def merge_and_render():
+        merged = _other_workers_samples()
+        for key, value in samples.items():
+            _add(merged, key, value)
+        return render(merged)
+
+    # Reading the other workers' files is disk I/O; keep it off the loop
+    return await asyncio.to_thread(merge_and_render)
+
+
+async def run_snapshot_writer():
+    """Publish this worker's totals periodically (started by the app lifespan)."""
+    Path(settings.metrics_dir).mkdir(parents=True, exist_ok=True)
+    try:
+        while True:
+            await asyncio.to_thread(write_worker_snapshot, _local_samples())
+            await asyncio.sleep(settings.metrics_write_interval_seconds)
+    finally:
+        write_worker_snapshot(_local_samples())
+
+
+# Request metrics (recorded by MetricsMiddleware)
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests handled, by route template and status.",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request latency, by route template and status.",
+    ("method", "route", "status")
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result")
+)
+
+WHATSAPP_MESSAGES = Counter(
+    "whatsapp_messages_total", "WhatsApp send attempts by provider and outcome.",
+    ("provider", "outcome")
+)
+
+THREADPOOL_BUSY = Gauge("threadpool_busy_threads", "Worker threads running sync endpoints and dependencies.")
+THREADPOOL_LIMIT = Gauge("threadpool_max_threads", "Size of the threadpool for sync endpoints and dependencies.")
+
+
+def _collect_threadpool():
+    from anyio import to_thread
+    try:
+        limiter = to_thread.current_default_thread_limiter()
+    except Exception:
+        return  # No running event loop (e.g. a script); nothing to report
+    yield THREADPOOL_BUSY, (), limiter.borrowed_tokens
+    yield THREADPOOL_LIMIT, (), limiter.total_tokens
+
+
+register_collector(_collect_threadpool)
@@ -1,40 +1,151 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import logging
+import random
 import time
-from app.utils.logging import log_info
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log request/response information."""
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        log_info(
-            f"Request started",
-            extra_data={
-                "method": request.method,
-                "url": str(request.url),
-                "client_ip": request.client.host
-            }
-        )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate processing time
-        process_time = time.time() - start_time
-        
-        # Log response
-        log_info(
-            f"Request completed",
-            extra_data={
-                "method": request.method,
-                "url": str(request.url),
-                "status_code": response.status_code,
-                "process_time": f"{process_time:.3f}s"
-            }
+from typing import Optional
+from urllib.parse import parse_qs
+from app.config import settings
+from app.utils.logging import log_access
+from app.utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from app.utils import query_stats
+
+
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware writing one structured access record per request.
+
+    Successful responses (< 400) are sampled at ``sample_rate``; client and
+    server errors and requests slower than ``slow_ms`` are always logged.
+    Event streams and long-polls (a ``wait`` query parameter) are held open
+    by design and never count as slow.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None, slow_ms: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.access_log_sample_rate if sample_rate is None else sample_rate
+        self.slow_seconds = (settings.access_log_slow_ms if slow_ms is None else slow_ms) / 1000.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        response = {"status": 500, "bytes": 0, "streaming": False}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        response["streaming"] = True
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            self._log(scope, response, time.perf_counter() - start_time)
+
+    def _log(self, scope, response: dict, duration: float):
+        status_code = response["status"]
+        slow = (
+            duration >= self.slow_seconds
+            and not response["streaming"]
+            and not _is_long_poll(scope)
         )
-        
-        return response
\ No newline at end of file
+        if status_code < 400 and not slow and random.random() >= self.sample_rate:
+            return
+
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400 or slow:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        client = scope.get("client")
+        # The query string is left out: it can carry tokens and phone numbers
+        log_access(level, {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "bytes": response["bytes"],
+            "client_ip": client[0] if client else None,
+            "slow": slow,
+            "sample_rate": 1.0 if status_code >= 400 or slow else self.sample_rate,
+        })
+
+
+def _is_long_poll(scope) -> bool:
+    return "wait" in parse_qs(scope.get("query_string", b"").decode("latin-1"))
+
+
+def _route_template(scope) -> str:
+    """
+    The matched route's path template (/api/v1/orders/{order_number}), which
+    keeps label values bounded. Routes of included routers only know their
+    path relative to the router, so prefer FastAPI's effective route, which
+    carries the full prefixed path.
+    """
+    effective_route = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(effective_route, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting requests and their latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status = [500]
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            labels = (scope["method"], _route_template(scope), str(status[0]))
+            HTTP_REQUESTS.inc(labels)
+            HTTP_REQUEST_DURATION.observe(labels, time.perf_counter() - start_time)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware collecting each request's SQL statements while SQL
+    instrumentation is on, and reporting the count and database time in a
+    ``Server-Timing`` header. Statements run after the response has started
+    (event streams, background tasks) only reach the metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not query_stats.is_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        queries = query_stats.start_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", queries.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.finish_request(queries, _route_template(scope))
@@ -0,0 +1,343 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.config import settings
+from app.utils.metrics import Counter, Gauge, register_collector
+from app.models.models import Order
+from app.utils.whatsapp import (
+    format_order_digest_message,
+    format_order_message,
+    format_status_update_message,
+    send_whatsapp_message
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OrderSummary:
+    """Plain snapshot of an order, safe to keep after the DB session closes."""
+    order_number: str
+    customer_name: str
+    total_amount: float
+    item_count: int
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_order(cls, order: Order) -> "OrderSummary":
+        return cls(
+            order_number=order.order_number,
+            customer_name=order.customer_name,
+            total_amount=order.total_amount,
+            item_count=sum(item.quantity for item in order.order_items),
+            created_at=order.created_at
+        )
+
+
+class OrderDigest:
+    """
+    Batch admin new-order alerts under high volume.
+
+    Orders are sent immediately while the number of orders seen in the
+    sliding window stays at or below ``immediate_threshold``. Above that,
+    orders are buffered and flushed as a single summary message when the
+    window elapses or ``max_orders`` are pending, so provider calls scale
+    with time windows rather than with order count.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], bool],
+        window_seconds: float,
+        immediate_threshold: int,
+        max_orders: int,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._send = send
+        self.window_seconds = window_seconds
+        self.immediate_threshold = immediate_threshold
+        self.max_orders = max_orders
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._pending: List[OrderSummary] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, summary: OrderSummary, message: str) -> bool:
+        """
+        Notify the admin about one order.
+
+        ``message`` is the full single-order message used when volume is low.
+        Returns True when the order was sent or accepted into a digest.
+        """
+        batch = None
+        with self._lock:
+            now = self._clock()
+            while self._recent and now - self._recent[0] > self.window_seconds:
+                self._recent.popleft()
+            self._recent.append(now)
+
+            immediate = not self._pending and len(self._recent) <= self.immediate_threshold
+            if not immediate:
+                self._pending.append(summary)
+                if len(self._pending) >= self.max_orders:
+                    batch = self._take_pending()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self.window_seconds, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+        if immediate:
+            return self._send(message)
+        if batch:
+            self._send_batch(batch)
+        return True
+
+    def flush(self) -> int:
+        """Send all buffered orders as one digest. Returns the number flushed."""
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._send_batch(batch)
+        return len(batch)
+
+    def _take_pending(self) -> List[OrderSummary]:
+        # Caller must hold self._lock
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _send_batch(self, batch: List[OrderSummary]) -> bool:
+        try:
+            success = self._send(format_order_digest_message(batch))
+        except Exception as e:
+            logger.error(f"Error sending order digest: {str(e)}")
+            success = False
+        if not success:
+            logger.error(
+                f"Order digest for {len(batch)} orders was not delivered: "
+                f"{', '.join(summary.order_number for summary in batch)}"
+            )
+        return success
+
+
+@dataclass
+class PendingStatusUpdate:
+    phone_number: str
+    message: str
+    status: str
+    initial_status: str
+    due: float
+    seq: int
+
+
+class StatusUpdateCoalescer:
+    """
+    Debounce customer status-update messages per order.
+
+    Each scheduled update (re)starts a quiet period for its order. When the
+    quiet period elapses only the latest status is sent; superseded updates
+    are dropped, and an update that lands back on the status the customer
+    started from is not sent at all. Sends happen on a single background
+    thread so request handlers never block on the provider.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str], bool],
+        quiet_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._send = send
+        self.quiet_seconds = quiet_seconds
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._pending: Dict[int, PendingStatusUpdate] = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._worker: Optional[threading.Thread] = None
+        self.metrics = {
+            "scheduled": 0,
+            "coalesced": 0,
+            "skipped_unchanged": 0,
+            "sent": 0,
+            "failed": 0
+        }
+
+    def schedule(self, order_id: int, phone_number: str, message: str, old_status: str, new_status: str):
+        """Queue a status update, superseding any pending one for the same order."""
+        self.schedule_many([(order_id, phone_number, message, old_status, new_status)])
+
+    def schedule_many(self, updates):
+        """
+        Queue a batch of updates under a single lock acquisition.
+
+        ``updates`` holds ``(order_id, phone_number, message, old_status, new_status)`` tuples.
+        """
+        with self._cond:
+            due = self._clock() + self.quiet_seconds
+            for order_id, phone_number, message, old_status, new_status in updates:
+                self.metrics["scheduled"] += 1
+                previous = self._pending.get(order_id)
+                if previous is not None:
+                    self.metrics["coalesced"] += 1
+                    old_status = previous.initial_status
+
+                seq = next(self._seq)
+                self._pending[order_id] = PendingStatusUpdate(
+                    phone_number=phone_number,
+                    message=message,
+                    status=new_status,
+                    initial_status=old_status,
+                    due=due,
+                    seq=seq
+                )
+                heapq.heappush(self._heap, (due, seq, order_id))
+
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="status-update-coalescer", daemon=True
+                )
+                self._worker.start()
+            self._cond.notify()
+
+    def flush(self) -> int:
+        """Send every pending update now. Returns the number of updates sent."""
+        with self._cond:
+            updates = list(self._pending.values())
+            self._pending.clear()
+            self._heap.clear()
+        for update in updates:
+            self._deliver(update)
+        return len(updates)
+
+    def snapshot_metrics(self) -> dict:
+        with self._cond:
+            metrics = dict(self.metrics)
+            metrics["pending"] = len(self._pending)
+        return metrics
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due_updates = self._pop_due()
+                while not due_updates:
+                    timeout = self._heap[0][0] - self._clock() if self._heap else None
+                    self._cond.wait(timeout)
+                    due_updates = self._pop_due()
+            for update in due_updates:
+                self._deliver(update)
+
+    def _pop_due(self) -> List[PendingStatusUpdate]:
+        # Caller must hold self._cond
+        now = self._clock()
+        due_updates = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, order_id = heapq.heappop(self._heap)
+            update = self._pending.get(order_id)
+            # Heap entries of superseded updates are stale; skip them
+            if update is not None and update.seq == seq:
+                del self._pending[order_id]
+                due_updates.append(update)
+        return due_updates
+
+    def _deliver(self, update: PendingStatusUpdate):
+        if update.status == update.initial_status:
+            outcome = "skipped_unchanged"
+        else:
+            try:
+                success = self._send(update.phone_number, update.message)
+            except Exception as e:
+                logger.error(f"Error sending WhatsApp status update: {str(e)}")
+                success = False
+            outcome = "sent" if success else "failed"
+        with self._cond:
+            self.metrics[outcome] += 1
+
+
+def _send_to_admin(message: str) -> bool:
+    return send_whatsapp_message(settings.whatsapp_admin_number, message)
+
+
+order_digest = OrderDigest(
+    send=_send_to_admin,
+    window_seconds=settings.whatsapp_digest_window_seconds,
+    immediate_threshold=settings.whatsapp_digest_immediate_threshold,
+    max_orders=settings.whatsapp_digest_max_orders
+)
+
+
+def notify_admin_new_order(order: Order) -> bool:
+    """Notify the admin about a new order, batching into digests when enabled."""
+    message = format_order_message(order)
+    if not settings.whatsapp_digest_enabled:
+        return _send_to_admin(message)
+    return order_digest.submit(OrderSummary.from_order(order), message)
+
+
+status_update_coalescer = StatusUpdateCoalescer(
+    send=send_whatsapp_message,
+    quiet_seconds=settings.whatsapp_status_quiet_seconds
+)
+
+
+def notify_customer_status_change(order: Order, old_status: str, new_status: str) -> None:
+    """Queue a debounced status-update message to the customer."""
+    status_update_coalescer.schedule(
+        order.id,
+        order.customer_phone,
+        format_status_update_message(order, new_status),
+        old_status,
+        new_status
+    )
+
+
+def notify_customers_status_change(orders, old_statuses: Dict[int, str], new_status: str) -> None:
+    """Queue debounced status-update messages for a batch of orders."""
+    status_update_coalescer.schedule_many(
+        (
+            order.id,
+            order.customer_phone,
+            format_status_update_message(order, new_status),
+            old_statuses[order.id],
+            new_status
+        )
+        for order in orders
+    )
+
+
+def get_notification_metrics() -> dict:
+    """Counters describing coalesced and delivered status notifications."""
+    return {"status_updates": status_update_coalescer.snapshot_metrics()}
+
+
+STATUS_UPDATES = Counter(
+    "whatsapp_status_updates_total",
+    "Customer status updates by outcome (scheduled, coalesced, skipped_unchanged, sent, failed).",
+    ("outcome",)
+)
+STATUS_UPDATES_PENDING = Gauge("whatsapp_status_updates_pending", "Status updates waiting out their quiet period.")
+
+
+def _collect_notification_metrics():
+    metrics = status_update_coalescer.snapshot_metrics()
+    yield STATUS_UPDATES_PENDING, (), metrics.pop("pending")
+    for outcome, count in metrics.items():
+        yield STATUS_UPDATES, (outcome,), count
+
+
+register_collector(_collect_notification_metrics)
+
+
+def flush_pending_notifications() -> None:
+    """Send anything still buffered (called on application shutdown)."""
+    order_digest.flush()
+    status_update_coalescer.flush()
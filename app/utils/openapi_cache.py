@@ -0,0 +1,141 @@
+import hashlib
+import inspect
+import json
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Set, Tuple, get_args
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+def _collect_types(annotation, found: Set[type]):
+    """Add the models and enums ``annotation`` uses, including nested ones."""
+    if isinstance(annotation, type) and issubclass(annotation, (BaseModel, Enum)):
+        if annotation in found:
+            return
+        found.add(annotation)
+        if issubclass(annotation, BaseModel):
+            for field in annotation.model_fields.values():
+                _collect_types(field.annotation, found)
+        return
+    for arg in get_args(annotation):
+        _collect_types(arg, found)
+
+
+def _iter_routes(routes: Sequence[BaseRoute]) -> Iterator[Tuple[str, BaseRoute, Any]]:
+    """(path, route, response model) of every route, including those of included routers."""
+    for route in routes:
+        # Recent FastAPI versions keep included routers nested instead of copying their routes
+        contexts = getattr(route, "effective_route_contexts", None)
+        if contexts is None:
+            yield getattr(route, "path", ""), route, getattr(route, "response_model", None)
+            continue
+        for context in contexts():
+            yield context.path, context.original_route, context.response_model
+
+
+def _params(dependant: Dependant) -> Iterator:
+    """Request parameters of an endpoint and of its sub-dependencies."""
+    yield from dependant.path_params
+    yield from dependant.query_params
+    yield from dependant.header_params
+    yield from dependant.cookie_params
+    yield from dependant.body_params
+    for sub_dependant in dependant.dependencies:
+        yield from _params(sub_dependant)
+
+
+def _type_sources(types: Set[type]) -> List[str]:
+    """The files defining ``types``; any edit to them may change the schema."""
+    files = set()
+    sources = []
+    for cls in types:
+        try:
+            path = inspect.getsourcefile(cls)
+        except TypeError:
+            path = None
+        if path is None:
+            # No source shipped: fall back to the fields as declared
+            sources.append(f"{cls.__module__}.{cls.__qualname__} {getattr(cls, 'model_fields', None)!r}")
+        else:
+            files.add(path)
+    sources.extend(Path(path).read_text(encoding="utf-8") for path in files)
+    # Sorted so the fingerprint doesn't depend on discovery order
+    return sorted(sources)
+
+
+def routes_fingerprint(app: FastAPI) -> str:
+    """
+    Identifies the app's routes, their parameters and the source files of
+    the Pydantic models (and enums) they accept and return. A cached schema
+    with another fingerprint is stale and is rebuilt.
+    """
+    parts = [app.title, app.version]
+    types: Set[type] = set()
+    for path, route, response_model in _iter_routes(app.routes):
+        methods = ",".join(sorted(getattr(route, "methods", None) or []))
+        endpoint = getattr(route, "endpoint", None)
+        parts.append(f"{methods} {path} {getattr(endpoint, '__qualname__', '')}")
+        if not isinstance(route, APIRoute):
+            continue
+        _collect_types(response_model, types)
+        for param in _params(route.dependant):
+            parts.append(f"  {param.name} {param.field_info!r}")
+            _collect_types(param.field_info.annotation, types)
+    parts.extend(_type_sources(types))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _read_cache(path: Path, fingerprint: str) -> Optional[dict]:
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("schema")
+
+
+def _write_cache(path: Path, fingerprint: str, schema: dict):
+    path.write_text(json.dumps({"fingerprint": fingerprint, "schema": schema}), encoding="utf-8")
+
+
+def install_openapi_cache(app: FastAPI, path: Optional[str]):
+    """
+    Serve the OpenAPI schema from ``path`` when it matches the app, so the
+    first /docs or /openapi.json request after a cold start doesn't rebuild it.
+    Without a path FastAPI builds it once per process, as usual.
+    """
+    if not path:
+        return
+    build_openapi = app.openapi
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            cache_file = Path(path)
+            fingerprint = routes_fingerprint(app)
+            schema = _read_cache(cache_file, fingerprint)
+            if schema is None:
+                schema = build_openapi()
+                try:
+                    _write_cache(cache_file, fingerprint, schema)
+                except OSError as e:
+                    logger.warning(f"Could not write OpenAPI cache {path}: {e}")
+            app.openapi_schema = schema
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+def write_openapi_cache(app: FastAPI, path: str) -> dict:
+    """Build the schema from scratch and store it in ``path`` (e.g. while building the image)."""
+    app.openapi_schema = None
+    schema = FastAPI.openapi(app)  # Bypasses an installed cache
+    _write_cache(Path(path), routes_fingerprint(app), schema)
+    return schema
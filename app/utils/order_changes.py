@@ -0,0 +1,75 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.models import OrderEvent
+
+ORDER_CREATED = "created"
+STATUS_CHANGED = "status_changed"
+NOTES_EDITED = "notes_edited"
+
+# Advisory lock key shared by every transaction that appends to the log
+EVENT_LOG_LOCK_KEY = 7_340_031
+
+
+def _lock_event_log(db: Session):
+    """
+    Make sequence numbers become visible in order. PostgreSQL hands out
+    sequence values on insert, but transactions commit in any order, so a
+    reader could see seq N+1 before N and move past N for good. This lock is
+    held from the append until commit, so appenders commit in seq order.
+    SQLite already lets only one transaction write at a time.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": EVENT_LOG_LOCK_KEY})
+
+
+def _status_key(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def _new_event(event_type: str, order, old_status=None, status=None) -> OrderEvent:
+    return OrderEvent(
+        order_id=order.id,
+        order_number=order.order_number,
+        event_type=event_type,
+        status=_status_key(status if status is not None else order.status),
+        old_status=_status_key(old_status),
+        notes=order.notes if event_type == NOTES_EDITED else None
+    )
+
+
+def record_order_event(db: Session, event_type: str, order, old_status=None) -> OrderEvent:
+    """
+    Append one change to the order event log. Call before committing the
+    order change so both land in the same transaction; the event's ``seq``
+    is assigned on return. The log stays locked until that commit, so
+    append as late in the transaction as possible.
+    """
+    event = _new_event(event_type, order, old_status)
+    _lock_event_log(db)
+    db.add(event)
+    db.flush()
+    return event
+
+
+def record_bulk_status_events(db: Session, orders: Iterable, new_status) -> List[OrderEvent]:
+    """Log a status change for each of ``orders``, which carry their old status."""
+    events = [
+        _new_event(STATUS_CHANGED, order, old_status=order.status, status=new_status)
+        for order in orders
+    ]
+    _lock_event_log(db)
+    db.add_all(events)
+    db.flush()
+    return events
+
+
+def read_order_changes(db: Session, since: int, limit: int) -> List[OrderEvent]:
+    """Events with a sequence number above ``since``, oldest first."""
+    return (
+        db.query(OrderEvent)
+        .filter(OrderEvent.seq > since)
+        .order_by(OrderEvent.seq)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+EXPORT_COLUMNS = [
+    "order_number",
+    "created_at",
+    "status",
+    "customer_name",
+    "customer_phone",
+    "customer_address",
+    "notes",
+    "order_total",
+    "product_id",
+    "product_name",
+    "product_sku",
+    "quantity",
+    "unit_price",
+    "line_total"
+]
+
+# Rows fetched from the database per round trip while streaming
+EXPORT_BATCH_SIZE = 1000
+
+
+def build_export_query(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    order_model=Order,
+    item_model=OrderItem
+):
+    """One flat row per order item, ordered so an order's lines stay together."""
+    query = (
+        select(
+            order_model.order_number,
+            order_model.created_at,
+            order_model.status,
+            order_model.customer_name,
+            order_model.customer_phone,
+            order_model.customer_address,
+            order_model.notes,
+            order_model.total_amount,
+            item_model.product_id,
+            item_model.product_name,
+            item_model.product_sku,
+            item_model.quantity,
+            item_model.price
+        )
+        .join(item_model, item_model.order_id == order_model.id)
+        .order_by(order_model.id, item_model.id)
+    )
+    if start:
+        query = query.where(order_model.created_at >= datetime.combine(start, datetime.min.time()))
+    if end:
+        query = query.where(order_model.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return query
+
+
+def _iter_export_rows(start: Optional[date], end: Optional[date]) -> Iterator[dict]:
+    # The export outlives the request's session, so it owns one for the stream
+    db = SessionLocal()
+    try:
+        # Archived orders are older, so they come first
+        for order_model, item_model in ((ArchivedOrder, ArchivedOrderItem), (Order, OrderItem)):
+            result = db.connection().execution_options(yield_per=EXPORT_BATCH_SIZE).execute(
+                build_export_query(start, end, order_model, item_model)
+            )
+            for row in result:
+                values = dict(zip(EXPORT_COLUMNS, row))
+                values["created_at"] = values["created_at"].isoformat() if values["created_at"] else None
+                values["line_total"] = round(values["quantity"] * values["unit_price"], 2)
+                yield values
+    finally:
+        db.close()
+
+
+def stream_orders_csv(start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Yield CSV text in chunks of EXPORT_BATCH_SIZE rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    pending = 0
+    for row in _iter_export_rows(start, end):
+        writer.writerow(row)
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def stream_orders_ndjson(start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Yield newline-delimited JSON in chunks of EXPORT_BATCH_SIZE rows."""
+    lines = []
+    for row in _iter_export_rows(start, end):
+        lines.append(json.dumps(row))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
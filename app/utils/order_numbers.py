@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import engine
+from app.models.models import OrderNumberWorker
+
+logger = logging.getLogger(__name__)
+
+# Snowflake-style layout: 41 bits of milliseconds since EPOCH_MS, 10 bits of
+# worker id and 12 bits of per-millisecond sequence (63 bits in total).
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# Concurrent claims can pick the same free id; the loser tries again
+CLAIM_ATTEMPTS = 5
+
+# Crockford base32: no I, L, O or U, and the alphabet is in ASCII order so
+# fixed-width encodings sort the same way as the ids they encode.
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ENCODED_LENGTH = 13
+
+
+def encode_base32(value: int) -> str:
+    """Encode a non-negative integer as fixed-width Crockford base32."""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        value, remainder = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+class WorkerLeaseExpired(Exception):
+    """The generator's worker id lease ran out; another process may hold the id."""
+
+
+class OrderIdGenerator:
+    """
+    Thread-safe generator of monotonic 63-bit order ids.
+
+    Ids from one generator strictly increase; ids from generators with
+    different worker ids can never collide. If the wall clock steps
+    backwards the generator keeps issuing ids from the last timestamp it
+    saw instead of reusing earlier ones.
+
+    A generator with a leased worker id refuses to issue ids once the
+    lease is older than ``lease_seconds`` without a renewal, since the id
+    may have been reclaimed by then.
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        clock: Callable[[], float] = time.time,
+        lease_seconds: Optional[float] = None
+    ):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self.pid = os.getpid()
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+        self._lease_until = None if lease_seconds is None else time.monotonic() + lease_seconds
+
+    def renew(self, renewed_at: float):
+        """Extend the lease from a renewal that started at ``renewed_at`` (time.monotonic)."""
+        with self._lock:
+            self._lease_until = renewed_at + self.lease_seconds
+
+    @property
+    def lease_valid(self) -> bool:
+        return self._lease_until is None or time.monotonic() < self._lease_until
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000) - EPOCH_MS
+
+    def next_id(self) -> int:
+        with self._lock:
+            if not self.lease_valid:
+                raise WorkerLeaseExpired(f"Lease on order worker id {self.worker_id} expired")
+            now_ms = max(self._now_ms(), self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond; borrow the next one
+                    now_ms = self._last_ms + 1
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (
+                (now_ms << (WORKER_ID_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+def order_id_timestamp(order_id: int) -> datetime:
+    """Return the UTC creation time encoded in an order id."""
+    ms = (order_id >> (WORKER_ID_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def format_order_number(order_id: int) -> str:
+    """Render an order id as ``ORD-YYYYMMDD-<13 base32 chars>``."""
+    return f"ORD-{order_id_timestamp(order_id).strftime('%Y%m%d')}-{encode_base32(order_id)}"
+
+
+def claim_worker_id() -> int:
+    """
+    Lease the lowest free worker id for this process.
+
+    Leases are rows in ``order_number_workers`` keyed by worker id, so the
+    database never hands one id to two live processes on any host. Ids
+    whose heartbeat is older than ORDER_WORKER_LEASE_SECONDS belong to
+    processes that died and are reclaimed first.
+    """
+    if settings.order_worker_id is not None:
+        return settings.order_worker_id
+    table = OrderNumberWorker.__table__
+    for _ in range(CLAIM_ATTEMPTS):
+        now = datetime.utcnow()
+        try:
+            with engine.begin() as conn:
+                conn.execute(delete(table).where(
+                    table.c.heartbeat_at < now - timedelta(seconds=settings.order_worker_lease_seconds)
+                ))
+                leased = set(conn.execute(select(table.c.id)).scalars())
+                worker_id = next((i for i in range(MAX_WORKER_ID + 1) if i not in leased), None)
+                if worker_id is None:
+                    raise RuntimeError(f"All {MAX_WORKER_ID + 1} order worker ids are leased")
+                conn.execute(insert(table).values(
+                    id=worker_id,
+                    hostname=socket.gethostname(),
+                    pid=os.getpid(),
+                    heartbeat_at=now
+                ))
+            return worker_id
+        except IntegrityError:
+            continue  # Claimed concurrently by another process
+    raise RuntimeError("Could not claim an order worker id")
+
+
+def _renew_lease(worker_id: int) -> bool:
+    """Refresh this process's lease; False if it was lost to another process."""
+    table = OrderNumberWorker.__table__
+    with engine.begin() as conn:
+        return conn.execute(
+            update(table)
+            .where(table.c.id == worker_id, table.c.hostname == socket.gethostname(), table.c.pid == os.getpid())
+            .values(heartbeat_at=datetime.utcnow())
+        ).rowcount == 1
+
+
+def _keep_lease(generator: "OrderIdGenerator"):
+    """Heartbeat for a claimed worker id; runs on a daemon thread."""
+    global _generator
+    interval = settings.order_worker_lease_seconds / 3
+    while True:
+        time.sleep(interval)
+        if _generator is not generator:
+            return  # Replaced after its lease ran out; the old row simply expires
+        started = time.monotonic()
+        try:
+            if _renew_lease(generator.worker_id):
+                generator.renew(started)
+                continue
+        except Exception as e:
+            # The lease survives a few failed renewals
+            logger.warning(f"Failed to renew order worker id {generator.worker_id}: {str(e)}")
+            continue
+        # Missed the lease (e.g. the process was suspended); another process
+        # may hold the id now, so stop using it and claim a fresh one
+        logger.error(f"Lost the lease on order worker id {generator.worker_id}; claiming a new one")
+        with _generator_lock:
+            if _generator is generator:
+                _generator = None
+        # Claim the replacement here rather than in the next order request
+        try:
+            get_order_id_generator()
+        except Exception as e:
+            logger.error(f"Failed to claim a new order worker id: {str(e)}")
+        return
+
+
+_generator: Optional[OrderIdGenerator] = None
+_generator_lock = threading.Lock()
+
+
+def _usable(generator: Optional[OrderIdGenerator]) -> bool:
+    return generator is not None and generator.pid == os.getpid() and generator.lease_valid
+
+
+def get_order_id_generator() -> OrderIdGenerator:
+    """
+    Return the process-wide generator, claiming a new worker id after a
+    fork or once the lease has run out. Claiming does database I/O: call
+    this at startup and from threads, not on the event loop.
+    """
+    global _generator
+    with _generator_lock:
+        if not _usable(_generator):
+            if settings.order_worker_id is not None:
+                _generator = OrderIdGenerator(settings.order_worker_id)
+            else:
+                started = time.monotonic()
+                _generator = OrderIdGenerator(
+                    claim_worker_id(),
+                    lease_seconds=settings.order_worker_lease_seconds
+                )
+                _generator.renew(started)
+                threading.Thread(target=_keep_lease, args=(_generator,), daemon=True).start()
+        return _generator
+
+
+def generate_order_number() -> str:
+    """Generate a unique, time-ordered order number."""
+    try:
+        return format_order_number(get_order_id_generator().next_id())
+    except WorkerLeaseExpired:
+        # Expired between the check and the id; the next call claims a new one
+        return format_order_number(get_order_id_generator().next_id())
+
+
+async def next_order_number() -> str:
+    """generate_order_number for the event loop; claiming a worker id runs on a thread."""
+    generator = _generator
+    if not _usable(generator):
+        generator = await asyncio.to_thread(get_order_id_generator)
+    try:
+        return format_order_number(generator.next_id())
+    except WorkerLeaseExpired:
+        return format_order_number((await asyncio.to_thread(get_order_id_generator)).next_id())
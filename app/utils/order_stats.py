@@ -0,0 +1,145 @@
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.models import ArchivedOrder, Order, OrderStatusStats
+
+# Statuses whose order totals count towards revenue
+REVENUE_STATUSES = ("confirmed", "preparing", "ready", "delivered")
+
+
+def _status_key(status) -> str:
+    # Accept both plain strings and OrderStatus enum members
+    return getattr(status, "value", status)
+
+
+def _apply_delta(db: Session, status, count_delta: int, amount_delta: float):
+    """Add deltas to one status row inside the caller's transaction."""
+    status = _status_key(status)
+    table = OrderStatusStats.__table__
+    stmt = update(table).where(table.c.status == status).values(
+        order_count=table.c.order_count + count_delta,
+        total_amount=table.c.total_amount + amount_delta
+    )
+    if db.execute(stmt).rowcount:
+        return
+
+    # First order with this status: create the row, or fall back to the
+    # update if a concurrent transaction created it first
+    try:
+        with db.begin_nested():
+            db.execute(insert(table).values(
+                status=status,
+                order_count=count_delta,
+                total_amount=amount_delta
+            ))
+    except IntegrityError:
+        db.execute(stmt)
+
+
+def record_order_created(db: Session, order: Order):
+    """Count a new order. Call before committing the order."""
+    _apply_delta(db, order.status or "pending", 1, order.total_amount)
+
+
+def record_status_change(db: Session, old_status, new_status, total_amount: float):
+    """Move one order between status rows. Call before committing the change."""
+    if _status_key(old_status) == _status_key(new_status):
+        return
+    _apply_delta(db, old_status, -1, -total_amount)
+    _apply_delta(db, new_status, 1, total_amount)
+
+
+def record_bulk_status_change(db: Session, changes, new_status):
+    """
+    Move many orders to ``new_status`` with one delta per old status.
+
+    ``changes`` is an iterable of ``(old_status, total_amount)`` pairs.
+    """
+    new_status = _status_key(new_status)
+    by_status = {}
+    for old_status, total_amount in changes:
+        old_status = _status_key(old_status)
+        if old_status == new_status:
+            continue
+        count, amount = by_status.get(old_status, (0, 0.0))
+        by_status[old_status] = (count + 1, amount + total_amount)
+
+    for old_status, (count, amount) in by_status.items():
+        _apply_delta(db, old_status, -count, -amount)
+    if by_status:
+        _apply_delta(
+            db,
+            new_status,
+            sum(count for count, _ in by_status.values()),
+            sum(amount for _, amount in by_status.values())
+        )
+
+
+def _compute_from_orders(db: Session) -> dict:
+    # Archived orders still count towards the totals
+    totals = {}
+    for model in (Order, ArchivedOrder):
+        rows = db.query(
+            model.status,
+            func.count(model.id),
+            func.coalesce(func.sum(model.total_amount), 0)
+        ).group_by(model.status).all()
+        for status, count, amount in rows:
+            previous_count, previous_amount = totals.get(status, (0, 0.0))
+            totals[status] = (previous_count + count, previous_amount + float(amount))
+    return totals
+
+
+def reconcile_order_stats(db: Session) -> dict:
+    """
+    Recompute the stats rows from the orders table and commit them.
+
+    Returns the drift found per status as ``{status: {"count": d, "amount": d}}``
+    where each delta is actual minus previously stored.
+    """
+    # Lock the stats rows before reading the orders. Writers update them in
+    # the same transaction as their order change, so a change the count
+    # below can't see yet applies its delta after this commits. A no-op
+    # UPDATE is used rather than SELECT ... FOR UPDATE because it also takes
+    # SQLite's write lock
+    table = OrderStatusStats.__table__
+    db.execute(update(table).values(order_count=table.c.order_count))
+    stored = {
+        row.status: (row.order_count, row.total_amount)
+        for row in db.query(OrderStatusStats).all()
+    }
+    actual = _compute_from_orders(db)
+
+    drift = {}
+    for status in set(actual) | set(stored):
+        actual_count, actual_amount = actual.get(status, (0, 0.0))
+        stored_count, stored_amount = stored.get(status, (0, 0.0))
+        if actual_count != stored_count or abs(actual_amount - stored_amount) > 0.005:
+            drift[status] = {
+                "count": actual_count - stored_count,
+                "amount": round(actual_amount - stored_amount, 2)
+            }
+
+    for status, delta in drift.items():
+        stored_amount = stored.get(status, (0, 0.0))[1]
+        _apply_delta(db, status, delta["count"], actual.get(status, (0, 0.0))[1] - stored_amount)
+    db.commit()
+
+    return drift
+
+
+def read_order_stats(db: Session) -> dict:
+    """Read dashboard totals from the maintained stats rows."""
+    totals = {row.status: (row.order_count, row.total_amount) for row in db.query(OrderStatusStats).all()}
+    if not totals and db.query(Order.id).first() is not None:
+        # Existing orders but no stats yet (e.g. first run after upgrade):
+        # count them directly until reconcile_order_stats.py fills the rows
+        totals = _compute_from_orders(db)
+
+    return {
+        "total_orders": sum(count for count, _ in totals.values()),
+        "status_breakdown": {status: count for status, (count, _) in totals.items() if count},
+        "total_revenue": sum(
+            amount for status, (_, amount) in totals.items() if status in REVENUE_STATUSES
+        )
+    }
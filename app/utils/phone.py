@@ -0,0 +1,49 @@
+import re
+from typing import Optional
+from app.config import settings
+
+# E.164 allows at most 15 digits after the country code prefix
+E164_MAX_DIGITS = 15
+E164_MIN_DIGITS = 8
+# A national number with its trunk "0" is never longer than this
+NATIONAL_MAX_DIGITS = 11
+
+_SEPARATORS = re.compile(r"[\s\-().\/]")
+
+
+def normalize_phone(phone: str, country_code: Optional[str] = None) -> str:
+    """
+    Normalize a phone number to E.164 (``+<country code><number>``).
+
+    Numbers without an international prefix are taken to be local to
+    ``country_code`` (default ``DEFAULT_PHONE_COUNTRY_CODE``). Raises
+    ValueError when the input cannot be a phone number.
+    """
+    country_code = country_code or settings.default_phone_country_code
+    value = _SEPARATORS.sub("", phone or "")
+
+    if value.startswith("+"):
+        digits = value[1:]
+    elif value.startswith("00"):
+        digits = value[2:]
+    elif value.startswith("0"):
+        digits = value[1:]
+        # "0<country code>..." is a mistyped "00" prefix unless it's short enough to be national
+        if not (digits.startswith(country_code) and len(value) > NATIONAL_MAX_DIGITS):
+            digits = country_code + digits
+    elif value.startswith(country_code) and len(value) > NATIONAL_MAX_DIGITS - 1:
+        digits = value
+    else:
+        digits = country_code + value
+
+    if not digits.isdigit() or not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        raise ValueError(f"Invalid phone number: {phone}")
+    return f"+{digits}"
+
+
+def try_normalize_phone(phone: str, country_code: Optional[str] = None) -> Optional[str]:
+    """Like ``normalize_phone`` but returns None for unparseable input."""
+    try:
+        return normalize_phone(phone, country_code)
+    except ValueError:
+        return None
@@ -0,0 +1,205 @@
+"""
+SQL instrumentation: statement counts and database time per request,
+suspected N+1 patterns and a slow-query log with query plans.
+
+Off by default (SQL_INSTRUMENTATION_ENABLED) and switched at runtime
+through /api/v1/diagnostics/sql-instrumentation. While off, no engine
+listeners are attached at all, so queries pay nothing. The switch reaches
+every running worker through the event broker; workers started later
+begin with SQL_INSTRUMENTATION_ENABLED.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.utils.events import event_broker
+from app.utils.metrics import Counter, Histogram
+
+logger = logging.getLogger("ecommerce_api.sql")
+
+# Plans of the same slow statement are looked up at most this often
+EXPLAIN_INTERVAL_SECONDS = 60.0
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+DB_QUERIES = Histogram(
+    "db_queries_per_request", "SQL statements issued per request, by route template.",
+    ("route",), buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+DB_TIME = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per request, by route template.",
+    ("route",)
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_suspected_total", "Requests repeating an identical statement, by route template.",
+    ("route",)
+)
+DB_SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SQL_SLOW_QUERY_MS.")
+
+
+class RequestQueries:
+    """The statements executed while handling one request."""
+    __slots__ = ("count", "seconds", "statements", "token")
+
+    def __init__(self):
+        self.token = None
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.seconds += duration
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated_statements(self) -> Dict[str, int]:
+        """Statements run often enough to suggest a query per row (N+1)."""
+        threshold = settings.sql_n_plus_one_threshold
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("sql_request_queries", default=None)
+
+_engines: List[Engine] = []
+_enabled = False
+_toggle_lock = threading.Lock()
+_explained_at: Dict[str, float] = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return  # Instrumentation was switched on mid-statement
+    duration = time.perf_counter() - started
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, duration)
+    if duration * 1000 >= settings.sql_slow_query_ms:
+        _log_slow_query(conn, statement, parameters, executemany, duration)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    now = time.monotonic()
+    if now - _explained_at.get(statement, -EXPLAIN_INTERVAL_SECONDS) < EXPLAIN_INTERVAL_SECONDS:
+        return None
+    if len(_explained_at) > 1000:
+        _explained_at.clear()
+    _explained_at[statement] = now
+
+    # A separate cursor, so the slow statement's own results stay untouched.
+    # It shares the request's transaction, and on PostgreSQL a failing
+    # statement aborts the whole transaction, so EXPLAIN runs in a savepoint
+    savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT sql_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT sql_explain")
+            raise
+        finally:
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT sql_explain")
+        return "\n".join(" | ".join(str(column) for column in row) for row in rows)
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(conn, statement: str, parameters, executemany: bool, duration: float):
+    DB_SLOW_QUERIES.inc()
+    plan = None
+    if not executemany:
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+    message = f"Slow query ({duration * 1000:.1f} ms): {statement} | Parameters: {repr(parameters)[:500]}"
+    if plan:
+        message += f"\nPlan:\n{plan}"
+    logger.warning(message)
+
+
+def _set_listeners(engine: Engine, attach: bool):
+    update = event.listen if attach else event.remove
+    update(engine, "before_cursor_execute", _before_cursor_execute)
+    update(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def watch_engine(engine: Engine):
+    """Instrument ``engine`` (a sync engine, or ``async_engine.sync_engine``) whenever enabled."""
+    with _toggle_lock:
+        _engines.append(engine)
+        if _enabled:
+            _set_listeners(engine, True)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _apply_enabled(enabled: bool):
+    """Attach or detach the listeners on every watched engine of this process."""
+    global _enabled
+    with _toggle_lock:
+        if enabled == _enabled:
+            return
+        for engine in _engines:
+            _set_listeners(engine, enabled)
+        _enabled = enabled
+
+
+def set_enabled(enabled: bool):
+    """Switch instrumentation on or off here and, through the event broker, in every worker."""
+    _apply_enabled(enabled)
+    event_broker.publish({"type": "sql_instrumentation.switched", "enabled": enabled, "internal": True})
+
+
+def start_request() -> RequestQueries:
+    """Collect the statements of the current request (and of threads it starts)."""
+    queries = RequestQueries()
+    queries.token = _current.set(queries)
+    return queries
+
+
+def finish_request(queries: RequestQueries, route: str):
+    """Record the request's totals and report suspected N+1 patterns."""
+    _current.reset(queries.token)
+    DB_QUERIES.observe((route,), queries.count)
+    DB_TIME.observe((route,), queries.seconds)
+    repeated = queries.repeated_statements()
+    if repeated:
+        DB_N_PLUS_ONE.inc((route,))
+        for statement, count in repeated.items():
+            logger.warning(f"Suspected N+1 on {route}: statement ran {count} times | {statement}")
+
+
+def _on_event(event: dict):
+    if event.get("type") == "sql_instrumentation.switched":
+        _apply_enabled(event["enabled"])
+
+
+event_broker.add_listener(_on_event)
+_apply_enabled(settings.sql_instrumentation_enabled)
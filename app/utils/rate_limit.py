@@ -0,0 +1,152 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+from app.config import settings
+
+
+class RateLimitStore:
+    """
+    Shared state for the limiter. ``update`` must apply ``fn`` to the
+    key's state atomically and return its result; ``update_async`` is what
+    request handlers await, and must not block the event loop.
+    """
+
+    def update(self, key: str, fn: Callable[[dict], float], ttl_seconds: float) -> float:
+        raise NotImplementedError
+
+    async def update_async(self, key: str, fn: Callable[[dict], float], ttl_seconds: float) -> float:
+        return self.update(key, fn, ttl_seconds)
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process state; bounded so a flood of distinct IPs can't grow it forever."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key: str, fn: Callable[[dict], float], ttl_seconds: float) -> float:
+        with self._lock:
+            state = self._states.get(key, {})
+            result = fn(state)
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+            return result
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """State shared by all workers in Redis, updated with optimistic transactions."""
+
+    def __init__(self, url: str, prefix: str = "login-limit:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LOGIN_RATE_BACKEND=redis requires the 'redis' package")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def update(self, key: str, fn: Callable[[dict], float], ttl_seconds: float) -> float:
+        key = self.prefix + key
+        outcome = {}
+
+        def apply(pipe):
+            raw = pipe.get(key)
+            state = json.loads(raw) if raw else {}
+            outcome["result"] = fn(state)
+            pipe.multi()
+            pipe.set(key, json.dumps(state), ex=max(1, int(ttl_seconds)))
+
+        self._client.transaction(apply, key)
+        return outcome["result"]
+
+    async def update_async(self, key: str, fn: Callable[[dict], float], ttl_seconds: float) -> float:
+        # The client is synchronous; its round trips run off the event loop
+        return await asyncio.to_thread(self.update, key, fn, ttl_seconds)
+
+
+@dataclass
+class LoginRateLimiter:
+    """
+    Token bucket with exponential lockout, applied per key (client IP,
+    username).
+
+    Every attempt takes a token; tokens refill at ``refill_per_second``
+    up to ``capacity``. Once ``lockout_threshold`` consecutive failures
+    pile up, each further failure locks the key for twice as long as the
+    last, up to ``lockout_max_seconds``. A success clears the failures.
+    """
+    store: RateLimitStore
+    capacity: float
+    refill_per_second: float
+    lockout_threshold: int
+    lockout_base_seconds: float
+    lockout_max_seconds: float
+
+    @property
+    def _ttl_seconds(self) -> float:
+        # Long enough that a full bucket or lockout is never forgotten early
+        return max(self.capacity / self.refill_per_second, self.lockout_max_seconds)
+
+    async def acquire(self, key: str) -> float:
+        """Take a token for an attempt. Returns 0 when allowed, else seconds to wait."""
+        def take(state: dict) -> float:
+            now = time.time()
+            if state.get("locked_until", 0) > now:
+                return state["locked_until"] - now
+            tokens = min(
+                self.capacity,
+                state.get("tokens", self.capacity) + (now - state.get("updated", now)) * self.refill_per_second
+            )
+            state["updated"] = now
+            if tokens < 1:
+                state["tokens"] = tokens
+                return (1 - tokens) / self.refill_per_second
+            state["tokens"] = tokens - 1
+            return 0.0
+
+        return await self.store.update_async(key, take, self._ttl_seconds)
+
+    async def record_failure(self, key: str):
+        def fail(state: dict) -> float:
+            failures = state.get("failures", 0) + 1
+            state["failures"] = failures
+            if failures >= self.lockout_threshold:
+                lockout = min(
+                    self.lockout_base_seconds * 2 ** (failures - self.lockout_threshold),
+                    self.lockout_max_seconds
+                )
+                state["locked_until"] = time.time() + lockout
+            return 0.0
+
+        await self.store.update_async(key, fail, self._ttl_seconds)
+
+    async def record_success(self, key: str):
+        def succeed(state: dict) -> float:
+            state.pop("failures", None)
+            state.pop("locked_until", None)
+            return 0.0
+
+        await self.store.update_async(key, succeed, self._ttl_seconds)
+
+
+def create_rate_limit_store() -> RateLimitStore:
+    if settings.login_rate_backend == "redis":
+        return RedisRateLimitStore(settings.login_rate_redis_url)
+    return InMemoryRateLimitStore(max_keys=settings.login_rate_max_keys)
+
+
+login_rate_limiter = LoginRateLimiter(
+    store=create_rate_limit_store(),
+    capacity=settings.login_rate_capacity,
+    refill_per_second=settings.login_rate_refill_per_minute / 60.0,
+    lockout_threshold=settings.login_lockout_threshold,
+    lockout_base_seconds=settings.login_lockout_base_seconds,
+    lockout_max_seconds=settings.login_lockout_max_seconds
+)
@@ -1,12 +1,18 @@
-import requests
 import logging
 from typing import Optional
 from app.config import settings
+from app.utils.metrics import WHATSAPP_MESSAGES
 from app.models.models import Order
 
 logger = logging.getLogger(__name__)
 
 
+def _post(*args, **kwargs):
+    # requests is imported on the first send so it doesn't slow down app startup
+    import requests
+    return requests.post(*args, **kwargs)
+
+
 def format_order_message(order: Order) -> str:
     """Format order details for WhatsApp message."""
     message = f"""🛒 *NEW ORDER RECEIVED*
@@ -24,7 +30,7 @@ def format_order_message(order: Order) -> str:
 """
     
     for item in order.order_items:
-        message += f"• {item.product.name} x{item.quantity} - ${item.price:.2f}\n"
+        message += f"• {item.product_name} x{item.quantity} - ${item.price:.2f}\n"
     
     if order.notes:
         message += f"\n📝 *Customer Notes:*\n{order.notes}"
@@ -35,6 +41,27 @@ def format_order_message(order: Order) -> str:
     return message
 
 
+def format_order_digest_message(orders: list) -> str:
+    """Format a batch of order summaries into a single WhatsApp digest."""
+    total = sum(order.total_amount for order in orders)
+    message = f"""🛒 *{len(orders)} NEW ORDERS RECEIVED*
+
+💰 *Combined Total:* ${total:.2f}
+
+📋 *Orders:*
+"""
+    
+    for order in orders:
+        message += (
+            f"• {order.order_number} - {order.customer_name} - "
+            f"{order.item_count} item(s) - ${order.total_amount:.2f}\n"
+        )
+    
+    message += f"\n👆 *Open the admin dashboard to review and confirm these orders!*"
+    
+    return message
+
+
 def send_whatsapp_facebook_api(phone_number: str, message: str) -> bool:
     """Send via Facebook/Meta WhatsApp Business API."""
     try:
@@ -50,7 +77,7 @@ def send_whatsapp_facebook_api(phone_number: str, message: str) -> bool:
             "text": {"body": message}
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = _post(url, json=payload, headers=headers, timeout=10)
         
         if response.status_code in [200, 201]:
             logger.info(f"WhatsApp message sent successfully via Facebook API to {phone_number}")
@@ -88,7 +115,7 @@ def send_whatsapp_twilio(phone_number: str, message: str) -> bool:
             "Body": message
         }
         
-        response = requests.post(settings.whatsapp_api_url, data=payload, headers=headers, timeout=10)
+        response = _post(settings.whatsapp_api_url, data=payload, headers=headers, timeout=10)
         
         if response.status_code in [200, 201]:
             logger.info(f"WhatsApp message sent successfully via Twilio to {phone_number}")
@@ -111,7 +138,7 @@ def send_whatsapp_generic_api(phone_number: str, message: str) -> bool:
             "token": settings.whatsapp_access_token
         }
         
-        response = requests.post(
+        response = _post(
             settings.whatsapp_api_url,
             json=payload,
             timeout=10
@@ -157,31 +184,37 @@ def send_whatsapp_message(phone_number: str, message: str) -> bool:
             print(f"📝 Message preview:\n{'-'*30}")
             print(message)
             print(f"{'-'*30}\n")
+            WHATSAPP_MESSAGES.inc(("development", "sent"))
             return True
         
         # Production mode - detect service type based on URL
         api_url = settings.whatsapp_api_url.lower()
         
         if "graph.facebook.com" in api_url:
-            return send_whatsapp_facebook_api(phone_number, message)
+            provider, send = "facebook", send_whatsapp_facebook_api
         elif "twilio.com" in api_url:
-            return send_whatsapp_twilio(phone_number, message)
+            provider, send = "twilio", send_whatsapp_twilio
         else:
-            return send_whatsapp_generic_api(phone_number, message)
+            provider, send = "generic", send_whatsapp_generic_api
+        
+        success = send(phone_number, message)
+        WHATSAPP_MESSAGES.inc((provider, "sent" if success else "failed"))
+        return success
             
     except Exception as e:
         logger.error(f"Error sending WhatsApp message: {str(e)}")
+        WHATSAPP_MESSAGES.inc(("unknown", "error"))
         return False
 
 
 def send_order_notification(order: Order) -> bool:
     """Send order notification to admin via WhatsApp."""
     message = format_order_message(order)
-    return send_whatsapp_message(settings.admin_whatsapp_number, message)
+    return send_whatsapp_message(settings.whatsapp_admin_number, message)
 
 
-def send_order_status_update(order: Order, new_status: str) -> bool:
-    """Send order status update to customer via WhatsApp."""
+def format_status_update_message(order: Order, new_status: str) -> str:
+    """Format order status update for WhatsApp message."""
     status_messages = {
         "confirmed": "✅ Your order has been confirmed and is being prepared!",
         "preparing": "👨‍🍳 Your order is being prepared with care!",
@@ -202,4 +235,10 @@ Total: ${order.total_amount:.2f}
 Thank you for choosing us! 🙏
 """
     
+    return message
+
+
+def send_order_status_update(order: Order, new_status: str) -> bool:
+    """Send order status update to customer via WhatsApp."""
+    message = format_status_update_message(order, new_status)
     return send_whatsapp_message(order.customer_phone, message)
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Move delivered and cancelled orders older than ARCHIVE_AFTER_DAYS (or the
+given number of days) out of the hot orders tables into the archive.
+Run it from cron, e.g. nightly: python archive_orders.py [days]
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.archive import run_archive_job
+
+
+def main():
+    older_than_days = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    archived = run_archive_job(older_than_days)
+    print(f"✅ Archived {archived} orders")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Concurrency benchmark for the public API.
+
+Opens N concurrent keep-alive connections against a running server and
+hammers a mix of read endpoints for a fixed duration, then reports
+throughput and latency percentiles.
+
+Usage:
+    uvicorn app.main:app --port 8000 --workers 1
+    python benchmarks/concurrency.py --url http://127.0.0.1:8000 --connections 500
+
+To compare the sync and async database layers, run it once against a
+checkout from before the async port and once against the current tree,
+with the same database and worker count.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/products/",
+    "/api/v1/products/categories/",
+    "/api/v1/cart/bench-session",
+    "/api/v1/cart/bench-session/total",
+]
+
+
+async def _worker(client: httpx.AsyncClient, paths, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(url: str, connections: int, duration: float, paths) -> dict:
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    timeout = httpx.Timeout(60.0)
+    latencies, errors = [], []
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        # Warm up connections and caches before measuring
+        await asyncio.gather(*(client.get(path) for path in paths))
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, paths, deadline, latencies, errors) for _ in range(connections)
+        ))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.mean(latencies) * 1000) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for the API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server")
+    parser.add_argument("--connections", type=int, default=500, help="Concurrent connections")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint to hit (repeatable)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.connections, args.duration, args.paths or DEFAULT_PATHS))
+    print(f"Connections: {args.connections}  Duration: {result['elapsed']:.1f}s")
+    print(f"Requests:    {result['requests']}  Errors: {result['errors']}")
+    print(f"Throughput:  {result['throughput']:.1f} req/s")
+    print(
+        f"Latency:     mean {result['mean_ms']:.1f} ms  p50 {result['p50_ms']:.1f} ms  "
+        f"p95 {result['p95_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
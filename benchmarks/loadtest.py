@@ -0,0 +1,465 @@
+"""
+Load test of the storefront and admin flows.
+
+Virtual users each loop over weighted scenarios:
+  - browse:   product listing, search, category filter, product pages
+  - cart:     add items to a guest cart, change quantities, view the total
+  - checkout: fill a cart, place the order (with an Idempotency-Key), look it up
+  - admin:    order list and lookups, status updates, stats and change feed
+
+Without --url the script starts its own uvicorn on a fresh SQLite database
+in a temporary directory and seeds it through the API, so runs on the same
+machine and commit are comparable. Results are reported per endpoint
+(route template) as throughput and p50/p95/p99 latency, and --output writes
+them as JSON; --compare prints the change against such a file.
+
+Usage:
+    python benchmarks/loadtest.py --duration 60 --users 50 --output results.json
+    python benchmarks/loadtest.py --workers 4 --compare results.json
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --no-seed --mix browse=1
+    python benchmarks/loadtest.py --database-url sqlite:///./bench.db --no-seed  # see seed_dataset.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "browse=60,cart=20,checkout=12,admin=8"
+SEARCH_TERMS = ["shirt", "phone", "rice", "blue", "premium", "classic", "mini", "set"]
+ADMIN = {"username": "loadtest", "email": "loadtest@example.com", "password": "loadtest-password"}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Recorder:
+    """Latencies and errors per endpoint; idle while warming up."""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        if not self.recording:
+            return
+        if ok:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+        else:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            latencies = self.latencies.get(endpoint, [])
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput": round(len(latencies) / elapsed, 2),
+                "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+                "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+            }
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        total = {
+            "requests": len(all_latencies),
+            "errors": sum(self.errors.values()),
+            "throughput": round(len(all_latencies) / elapsed, 2),
+            "p50_ms": round(_percentile(all_latencies, 50) * 1000, 2),
+            "p95_ms": round(_percentile(all_latencies, 95) * 1000, 2),
+            "p99_ms": round(_percentile(all_latencies, 99) * 1000, 2),
+        }
+        return {"elapsed": round(elapsed, 2), "total": total, "endpoints": endpoints}
+
+
+class VirtualUser:
+    """One simulated client with its own random stream and guest cart."""
+
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, catalog: dict,
+                 admin_headers: dict, seed: int, think_seconds: float):
+        self.client = client
+        self.recorder = recorder
+        self.catalog = catalog
+        self.admin_headers = admin_headers
+        self.random = random.Random(seed * 100003 + index)
+        self.think_seconds = think_seconds
+        self.index = index
+
+    async def request(self, endpoint: str, method: str, path: str, expected=(200,), **kwargs):
+        """``endpoint`` is the route template results are grouped by."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            ok = response.status_code in expected
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record(endpoint, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    async def think(self):
+        if self.think_seconds:
+            await asyncio.sleep(self.random.expovariate(1 / self.think_seconds))
+
+    def _product_id(self) -> int:
+        # Popular products get most of the traffic, like a real storefront
+        products = self.catalog["product_ids"]
+        return products[min(int(self.random.paretovariate(1.2)) - 1, len(products) - 1)]
+
+    def _session_id(self) -> str:
+        return f"lt-{self.index}-{self.random.getrandbits(48):x}"
+
+    async def browse(self):
+        await self.request("GET /api/v1/products/", "GET", "/api/v1/products/",
+                           params={"skip": self.random.randrange(0, 5) * 20, "limit": 20})
+        await self.think()
+        await self.request("GET /api/v1/products/?search", "GET", "/api/v1/products/",
+                           params={"search": self.random.choice(SEARCH_TERMS), "limit": 20})
+        await self.think()
+        if self.catalog["category_ids"]:
+            await self.request("GET /api/v1/products/?category_id", "GET", "/api/v1/products/",
+                               params={"category_id": self.random.choice(self.catalog["category_ids"]), "limit": 20})
+            await self.think()
+        for _ in range(self.random.randint(1, 3)):
+            await self.request("GET /api/v1/products/{product_id}", "GET", f"/api/v1/products/{self._product_id()}")
+            await self.think()
+        await self.request("GET /api/v1/products/categories/", "GET", "/api/v1/products/categories/")
+
+    async def _fill_cart(self, session_id: str) -> list:
+        items = []
+        for product_id in {self._product_id() for _ in range(self.random.randint(1, 3))}:
+            response = await self.request(
+                "POST /api/v1/cart/", "POST", "/api/v1/cart/",
+                json={"session_id": session_id, "product_id": product_id, "quantity": self.random.randint(1, 2)}
+            )
+            if response is not None:
+                items.append(response.json()["id"])
+            await self.think()
+        return items
+
+    async def cart(self):
+        session_id = self._session_id()
+        items = await self._fill_cart(session_id)
+        if items:
+            await self.request(
+                "PUT /api/v1/cart/{cart_item_id}", "PUT", f"/api/v1/cart/{self.random.choice(items)}",
+                params={"session_id": session_id}, json={"quantity": self.random.randint(1, 4)}
+            )
+            await self.think()
+        await self.request("GET /api/v1/cart/{session_id}", "GET", f"/api/v1/cart/{session_id}")
+        await self.request("GET /api/v1/cart/{session_id}/total", "GET", f"/api/v1/cart/{session_id}/total")
+        await self.think()
+        await self.request("DELETE /api/v1/cart/{session_id}/clear", "DELETE", f"/api/v1/cart/{session_id}/clear")
+
+    async def checkout(self):
+        session_id = self._session_id()
+        if not await self._fill_cart(session_id):
+            return
+        await self.request("GET /api/v1/cart/{session_id}/total", "GET", f"/api/v1/cart/{session_id}/total")
+        await self.think()
+        phone = f"+23320{self.random.randrange(10 ** 7):07d}"
+        order = await self.request(
+            "POST /api/v1/orders/", "POST", "/api/v1/orders/",
+            headers={"Idempotency-Key": str(uuid.UUID(int=self.random.getrandbits(128)))},
+            json={
+                "customer_name": f"Load Test {self.index}",
+                "customer_phone": phone,
+                "customer_address": "1 Benchmark Street, Accra",
+                "session_id": session_id,
+            }
+        )
+        if order is not None:
+            await self.think()
+            await self.request("GET /api/v1/orders/{order_number}", "GET",
+                               f"/api/v1/orders/{order.json()['order_number']}", params={"customer_phone": phone})
+
+    async def admin(self):
+        headers = self.admin_headers
+        orders = await self.request(
+            "GET /api/v1/orders/admin/all", "GET", "/api/v1/orders/admin/all",
+            params={"limit": 50, "status": self.random.choice(["pending", "confirmed", None])},
+            headers=headers
+        )
+        await self.think()
+        if orders is not None and orders.json():
+            picked = self.random.choice(orders.json())
+            await self.request("GET /api/v1/orders/admin/by-number/{order_number}", "GET",
+                               f"/api/v1/orders/admin/by-number/{picked['order_number']}", headers=headers)
+            await self.think()
+            if picked["status"] in ("pending", "confirmed"):
+                next_status = "confirmed" if picked["status"] == "pending" else "preparing"
+                # Another virtual user may have moved it on already
+                await self.request("PUT /api/v1/orders/admin/{order_id}", "PUT",
+                                   f"/api/v1/orders/admin/{picked['id']}", expected=(200, 400, 409),
+                                   json={"status": next_status}, headers=headers)
+                await self.think()
+        await self.request("GET /api/v1/orders/admin/stats", "GET", "/api/v1/orders/admin/stats", headers=headers)
+        await self.request("GET /api/v1/orders/admin/changes", "GET", "/api/v1/orders/admin/changes",
+                           params={"since": 0, "limit": 100}, headers=headers)
+
+    async def run(self, mix: dict, deadline: float):
+        scenarios = [getattr(self, name) for name in mix]
+        weights = list(mix.values())
+        while time.perf_counter() < deadline:
+            await self.random.choices(scenarios, weights)[0]()
+            await self.think()
+
+
+async def _admin_headers(client: httpx.AsyncClient) -> dict:
+    # Registration fails harmlessly when the admin exists from an earlier run
+    await client.post("/api/v1/auth/admin/register", json=ADMIN)
+    response = await client.post(
+        "/api/v1/auth/admin/login", data={"username": ADMIN["username"], "password": ADMIN["password"]}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(client: httpx.AsyncClient, headers: dict, products: int, categories: int, rng: random.Random):
+    """Create a catalog through the API (fine for thousands of products; use seed_dataset.py beyond that)."""
+    category_ids = []
+    for index in range(categories):
+        response = await client.post("/api/v1/products/categories/", headers=headers, json={
+            "name": f"Load test category {index}", "description": f"Category {index}"
+        })
+        if response.status_code == 200:
+            category_ids.append(response.json()["id"])
+
+    semaphore = asyncio.Semaphore(20)
+
+    async def create_product(index: int):
+        term, other = rng.choice(SEARCH_TERMS), rng.choice(SEARCH_TERMS)
+        payload = {
+            "name": f"{term.title()} {other} {index}",
+            "description": f"A {term} {other} for load testing",
+            "price": round(rng.uniform(1, 500), 2),
+            "sku": f"LT-{index:06d}",
+            "stock_quantity": 1_000_000,
+            "category_ids": rng.sample(category_ids, min(len(category_ids), rng.randint(1, 2))),
+        }
+        async with semaphore:
+            await client.post("/api/v1/products/", headers=headers, json=payload)
+
+    await asyncio.gather(*(create_product(index) for index in range(products)))
+
+
+async def load_catalog(client: httpx.AsyncClient, max_products: int) -> dict:
+    """Ids of the active products (most popular first in the load) and categories."""
+    product_ids = []
+    while len(product_ids) < max_products:
+        response = await client.get("/api/v1/products/", params={"skip": len(product_ids), "limit": 100})
+        response.raise_for_status()
+        page = response.json()
+        product_ids.extend(product["id"] for product in page)
+        if len(page) < 100:
+            break
+    response = await client.get("/api/v1/products/categories/")
+    response.raise_for_status()
+    return {"product_ids": product_ids, "category_ids": [category["id"] for category in response.json()]}
+
+
+async def run(args, url: str) -> dict:
+    mix = _parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=httpx.Timeout(60.0)) as client:
+        headers = await _admin_headers(client)
+        if not args.no_seed:
+            await seed(client, headers, args.products, args.categories, random.Random(args.seed))
+        catalog = await load_catalog(client, args.max_catalog)
+        if not catalog["product_ids"]:
+            raise RuntimeError("No products to load test; seed the database or drop --no-seed")
+
+        recorder = Recorder()
+        users = [
+            VirtualUser(index, client, recorder, catalog, headers, args.seed, args.think_ms / 1000.0)
+            for index in range(args.users)
+        ]
+        started = time.perf_counter()
+        deadline = started + args.warmup + args.duration
+
+        async def start_recording():
+            await asyncio.sleep(args.warmup)
+            recorder.recording = True
+            return time.perf_counter()
+
+        recording_task = asyncio.create_task(start_recording())
+        await asyncio.gather(*(user.run(mix, deadline) for user in users))
+        elapsed = time.perf_counter() - await recording_task
+
+    result = recorder.summary(elapsed)
+    result["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "url": url if args.url else "local uvicorn",
+        "workers": args.workers if not args.url else None,
+        "database": None if args.url else args.database_url or "fresh SQLite",
+        "users": args.users,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "think_ms": args.think_ms,
+        "mix": mix,
+        "seed": args.seed,
+        "products": len(catalog["product_ids"]),
+    }
+    return result
+
+
+def _parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("browse", "cart", "checkout", "admin"):
+            raise SystemExit(f"Unknown scenario in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def start_server(args, workdir: str) -> tuple:
+    """Start uvicorn on --database-url, or on a fresh SQLite database in ``workdir``."""
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        "LOG_DIR": os.path.join(workdir, "logs"),
+        "AUTO_CREATE_SCHEMA": "False",
+        "ENVIRONMENT": "development",
+    })
+    env.update(item.split("=", 1) for item in args.env)
+    # Create the tables once, before several workers would race to do it
+    subprocess.run([sys.executable, "create_schema.py"], cwd=PROJECT_ROOT, env=env,
+                   stdout=subprocess.DEVNULL, check=True)
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", args.app, "--port", str(port), "--workers", str(args.workers),
+         "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 60
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        if time.perf_counter() > deadline:
+            server.terminate()
+            raise RuntimeError("Server did not start within 60s")
+        try:
+            if httpx.get(url + "/health", timeout=1.0).status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+
+
+def print_report(result: dict, baseline: dict = None):
+    endpoints = result["endpoints"]
+    base_endpoints = (baseline or {}).get("endpoints", {})
+    width = max([len("endpoint")] + [len(name) for name in endpoints])
+    header = f"{'endpoint':<{width}}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'errors':>6}"
+    if baseline:
+        header += f"  {'Δ req/s':>8}  {'Δ p95':>8}"
+    print(header)
+    rows = list(endpoints.items()) + [("TOTAL", result["total"])]
+    for name, stats in rows:
+        line = (f"{name:<{width}}  {stats['throughput']:>8.1f}  {stats['p50_ms']:>8.1f}  "
+                f"{stats['p95_ms']:>8.1f}  {stats['p99_ms']:>8.1f}  {stats['errors']:>6}")
+        base = baseline["total"] if baseline and name == "TOTAL" else base_endpoints.get(name)
+        if base:
+            line += f"  {_change(stats['throughput'], base['throughput']):>8}  {_change(stats['p95_ms'], base['p95_ms']):>8}"
+        print(line)
+
+
+def _change(current: float, previous: float) -> str:
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the storefront and admin flows")
+    parser.add_argument("--url", help="Base URL of a running server (default: start one on a fresh database)")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app for the local server")
+    parser.add_argument("--database-url", help="Database for the local server (default: a fresh SQLite file)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE for the local server")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before that")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. browse=60,cart=20,checkout=12,admin=8")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the catalog and every user's choices")
+    parser.add_argument("--products", type=int, default=500, help="Products to seed")
+    parser.add_argument("--categories", type=int, default=12, help="Categories to seed")
+    parser.add_argument("--no-seed", action="store_true", help="Use the server's existing catalog")
+    parser.add_argument("--max-catalog", type=int, default=5000, help="Most products to draw from")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Results JSON of an earlier run to compare with")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        server = None
+        url = args.url
+        if not url:
+            server, url = start_server(args, workdir)
+        try:
+            result = asyncio.run(run(args, url))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    meta = result["meta"]
+    print(f"Commit {meta['commit']}  users {meta['users']}  duration {meta['duration']:.0f}s  "
+          f"mix {args.mix}  products {meta['products']}")
+    if baseline:
+        print(f"Compared with commit {baseline['meta']['commit']} ({baseline['meta']['timestamp']})")
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
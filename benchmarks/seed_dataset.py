@@ -0,0 +1,412 @@
+"""
+Synthetic dataset generator for benchmarking.
+
+Fills an empty database with a catalog, guest carts and an order history
+shaped like real traffic:
+  - product popularity follows a Zipf distribution (a few best sellers,
+    a long tail), and so do repeat customers
+  - orders follow a diurnal curve (quiet nights, lunch and evening peaks),
+    a weekly cycle and slow growth over the period
+  - old orders are delivered or cancelled; recent ones are still in flight
+
+Rows are generated in chronological order with explicit ids and written
+in batches: Core ``executemany`` on SQLite, ``COPY`` on PostgreSQL. The
+order statistics rollup is rebuilt at the end. The same --seed, sizes and
+--end always produce the same data.
+
+Usage:
+    python benchmarks/seed_dataset.py --database-url sqlite:///./bench.db \\
+        --products 1000000 --orders 3300000 --items-per-order 3
+    DATABASE_URL=sqlite:///./bench.db uvicorn app.main:app --workers 4 &
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --no-seed
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import random
+import sys
+import time
+from bisect import bisect
+from datetime import date, datetime, timedelta, timezone
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import Base
+from app.models.models import (
+    CartItem, Category, Order, OrderEvent, OrderItem, OrderStatusStats, Product, product_categories
+)
+from app.utils.db_pool import apply_sqlite_pragmas
+from app.utils.order_changes import ORDER_CREATED, STATUS_CHANGED
+from app.utils.order_numbers import EPOCH_MS, MAX_WORKER_ID, OrderIdGenerator, format_order_number
+from app.utils.order_stats import reconcile_order_stats
+
+# Share of a day's orders placed in each local hour
+DIURNAL_WEIGHTS = [
+    0.6, 0.3, 0.2, 0.2, 0.3, 0.8, 1.8, 3.2, 4.5, 5.2, 5.8, 6.6,
+    7.4, 7.0, 5.9, 5.4, 5.6, 6.3, 7.2, 7.9, 7.6, 5.9, 3.6, 1.6,
+]
+# Monday first; weekends are busier
+WEEKDAY_WEIGHTS = [0.92, 0.9, 0.93, 0.97, 1.05, 1.2, 1.13]
+
+ADJECTIVES = [
+    "Classic", "Premium", "Organic", "Compact", "Deluxe", "Vintage", "Smart", "Eco", "Mini", "Pro",
+    "Soft", "Heavy-Duty", "Wireless", "Handmade", "Portable", "Bright", "Slim", "Family", "Travel", "Daily",
+]
+NOUNS = [
+    "Shirt", "Dress", "Sneakers", "Phone", "Headphones", "Blender", "Kettle", "Rice", "Coffee", "Backpack",
+    "Lamp", "Chair", "Notebook", "Watch", "Sunglasses", "Towel", "Shampoo", "Speaker", "Charger", "Jacket",
+    "Pan", "Mug", "Blanket", "Football", "Yoga Mat", "Perfume", "Novel", "Cookbook", "Plant Pot", "Drill",
+]
+DEPARTMENTS = [
+    "Electronics", "Fashion", "Groceries", "Home", "Kitchen", "Beauty", "Sports", "Books", "Garden", "Tools",
+    "Toys", "Office", "Health", "Baby", "Automotive", "Pets", "Music", "Travel", "Outdoor", "Crafts",
+]
+FIRST_NAMES = ["Ama", "Kofi", "Akosua", "Kwame", "Efua", "Yaw", "Abena", "Kojo", "Esi", "Kwabena", "Adwoa", "Kwesi"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Agyeman", "Darko", "Ofori"]
+STREETS = ["Oxford Street", "Ring Road", "Liberation Road", "Spintex Road", "Cantonments Road", "Kanda Highway"]
+
+IN_FLIGHT_STATUSES = ["pending", "confirmed", "preparing", "ready"]
+# Units per order line: mostly one
+QUANTITIES = (1, 2, 3, 4, 5)
+QUANTITY_CUM_WEIGHTS = list(itertools.accumulate((70, 18, 7, 3, 2)))
+
+
+class ZipfSampler:
+    """Draws ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent."""
+
+    def __init__(self, n: int, exponent: float, rng: random.Random):
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate((rank + 1) ** -exponent for rank in range(n)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self) -> int:
+        return bisect(self.cum_weights, self.rng.random() * self.total)
+
+
+class BatchWriter:
+    """
+    Buffers rows per table and writes them in batches, parents before
+    children so foreign keys hold on databases that enforce them.
+    """
+
+    def __init__(self, engine, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+        self.buffers = {}
+        self.written = {}
+        self.order = {table: index for index, table in enumerate(Base.metadata.sorted_tables)}
+
+    def add(self, table, row: dict):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with self.engine.begin() as conn:
+            for table in sorted(self.buffers, key=self.order.get):
+                rows = self.buffers[table]
+                if not rows:
+                    continue
+                if self.use_copy:
+                    self._copy(conn, table, rows)
+                else:
+                    conn.execute(table.insert(), rows)
+                self.written[table.name] = self.written.get(table.name, 0) + len(rows)
+                self.buffers[table] = []
+
+    @staticmethod
+    def _copy(conn, table, rows: list):
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if row[column] is None else row[column] for column in columns])
+        buffer.seek(0)
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+
+def _timestamp(day: date, seconds: float) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+
+
+def _orders_per_day(args, rng: random.Random) -> list:
+    """Split --orders over the days, with weekly cycle, growth and noise."""
+    days = [args.end - timedelta(days=offset) for offset in range(args.days - 1, -1, -1)]
+    weights = [
+        WEEKDAY_WEIGHTS[day.weekday()] * (1 + args.growth * index / max(args.days - 1, 1)) * rng.uniform(0.85, 1.15)
+        for index, day in enumerate(days)
+    ]
+    total = sum(weights)
+    counts = [int(args.orders * weight / total) for weight in weights]
+    for index in range(args.orders - sum(counts)):
+        counts[index % len(counts)] += 1
+    return list(zip(days, counts))
+
+
+def _product_name(index: int) -> str:
+    return f"{ADJECTIVES[index % len(ADJECTIVES)]} {NOUNS[(index // len(ADJECTIVES)) % len(NOUNS)]} {index}"
+
+
+def _sku(product_id: int) -> str:
+    return f"SEED-{product_id:08d}"
+
+
+def seed_catalog(writer: BatchWriter, args, rng: random.Random, start: datetime) -> list:
+    """Categories and products; returns every product's price."""
+    for category_id in range(1, args.categories + 1):
+        department = DEPARTMENTS[(category_id - 1) % len(DEPARTMENTS)]
+        writer.add(Category.__table__, {
+            "id": category_id,
+            "name": f"{department} {category_id}" if args.categories > len(DEPARTMENTS) else department,
+            "description": f"Everything {department.lower()}",
+            "is_active": True,
+            "created_at": start,
+        })
+
+    # Category sizes are skewed too: a few departments hold most of the catalog
+    category_sampler = ZipfSampler(args.categories, 0.9, rng)
+    prices = []
+    catalog_seconds = max((args.end - start.date()).total_seconds(), 1)
+    for product_id in range(1, args.products + 1):
+        price = round(max(0.5, rng.lognormvariate(3.2, 1.0)), 2)
+        prices.append(price)
+        writer.add(Product.__table__, {
+            "id": product_id,
+            "name": _product_name(product_id),
+            "description": f"{_product_name(product_id)}, made for everyday use",
+            "price": price,
+            "sku": _sku(product_id),
+            "stock_quantity": rng.randint(0, 500),
+            "image_url": None,
+            "is_active": rng.random() >= args.inactive_share,
+            "weight": round(rng.uniform(0.05, 20), 2),
+            "dimensions": None,
+            "created_at": start + timedelta(seconds=catalog_seconds * product_id / (args.products + 1)),
+        })
+        for category_id in sorted({category_sampler.sample() + 1 for _ in range(rng.choice((1, 1, 2, 3)))}):
+            writer.add(product_categories, {"product_id": product_id, "category_id": category_id})
+    return prices
+
+
+def _final_status(age_days: float, rng: random.Random) -> str:
+    if age_days >= 3:
+        return "cancelled" if rng.random() < 0.07 else "delivered"
+    if age_days >= 1:
+        return rng.choices(["delivered", "ready", "preparing", "cancelled"], [60, 20, 12, 8])[0]
+    return rng.choices(IN_FLIGHT_STATUSES, [40, 30, 20, 10])[0]
+
+
+def seed_orders(writer: BatchWriter, args, rng: random.Random, prices: list):
+    # Popular products are spread through the catalog instead of being the lowest ids
+    popularity = list(range(1, args.products + 1))
+    rng.shuffle(popularity)
+    product_sampler = ZipfSampler(args.products, args.zipf_exponent, rng)
+    customer_sampler = ZipfSampler(args.customers, 0.7, rng)
+    now = datetime.combine(args.end + timedelta(days=1), datetime.min.time(), timezone.utc)
+
+    clock = [0.0]
+    generator = OrderIdGenerator(MAX_WORKER_ID, clock=lambda: clock[0])
+    order_id = item_id = event_seq = 0
+    mean_extra_items = max(args.items_per_order - 1, 0)
+    hourly = list(itertools.accumulate(DIURNAL_WEIGHTS))
+    utc_offset = args.utc_offset_hours * 3600
+
+    for day, count in _orders_per_day(args, rng):
+        # Local hours on the diurnal curve, stored as UTC, in time order
+        seconds = sorted(
+            (bisect(hourly, rng.random() * hourly[-1]) + rng.random()) * 3600 - utc_offset for _ in range(count)
+        )
+        for offset in seconds:
+            created_at = _timestamp(day, offset)
+            clock[0] = created_at.timestamp()
+            order_id += 1
+            order_number = format_order_number(generator.next_id())
+            customer = customer_sampler.sample()
+            phone = f"+23324{customer:07d}"
+            status = _final_status((now - created_at).total_seconds() / 86400, rng)
+
+            item_count = 1 + (int(rng.expovariate(1 / mean_extra_items) + 0.5) if mean_extra_items else 0)
+            items = []
+            for product_id in sorted({popularity[product_sampler.sample()] for _ in range(item_count)}):
+                item_id += 1
+                items.append({
+                    "id": item_id,
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "quantity": rng.choices(QUANTITIES, cum_weights=QUANTITY_CUM_WEIGHTS)[0],
+                    "price": prices[product_id - 1],
+                    "product_name": _product_name(product_id),
+                    "product_sku": _sku(product_id),
+                    "product_image_url": None,
+                    "created_at": created_at,
+                })
+            total = sum(item["price"] * item["quantity"] for item in items)
+
+            updated_at = created_at + timedelta(hours=rng.uniform(0.5, 48)) if status != "pending" else None
+            if updated_at is not None and updated_at > now:
+                updated_at = now
+            writer.add(Order.__table__, {
+                "id": order_id,
+                "order_number": order_number,
+                "customer_name": f"{FIRST_NAMES[customer % len(FIRST_NAMES)]} "
+                                 f"{LAST_NAMES[(customer // len(FIRST_NAMES)) % len(LAST_NAMES)]}",
+                "customer_phone": phone,
+                "customer_phone_normalized": phone,
+                "customer_address": f"{customer % 200 + 1} {STREETS[customer % len(STREETS)]}, Accra",
+                "status": status,
+                "total_amount": round(total, 2),
+                "notes": None,
+                "whatsapp_sent": True,
+                "created_at": created_at,
+                "updated_at": updated_at,
+            })
+
+            # Items after their order, so a flush never writes them first
+            for item in items:
+                writer.add(OrderItem.__table__, item)
+
+            event_seq += 1
+            writer.add(OrderEvent.__table__, {
+                "seq": event_seq, "order_id": order_id, "order_number": order_number,
+                "event_type": ORDER_CREATED, "status": "pending", "old_status": None,
+                "notes": None, "created_at": created_at,
+            })
+            if updated_at is not None:
+                event_seq += 1
+                writer.add(OrderEvent.__table__, {
+                    "seq": event_seq, "order_id": order_id, "order_number": order_number,
+                    "event_type": STATUS_CHANGED, "status": status, "old_status": "pending",
+                    "notes": None, "created_at": updated_at,
+                })
+
+
+def seed_carts(writer: BatchWriter, args, rng: random.Random):
+    """Open guest carts from the last two days."""
+    product_sampler = ZipfSampler(args.products, args.zipf_exponent, rng)
+    now = datetime.combine(args.end + timedelta(days=1), datetime.min.time(), timezone.utc)
+    item_id = 0
+    for cart in range(args.carts):
+        session_id = f"seed-{cart:08d}-{rng.getrandbits(32):08x}"
+        created_at = now - timedelta(seconds=rng.uniform(0, 2 * 86400))
+        for product_id in sorted({product_sampler.sample() + 1 for _ in range(rng.randint(1, 4))}):
+            item_id += 1
+            writer.add(CartItem.__table__, {
+                "id": item_id,
+                "session_id": session_id,
+                "product_id": product_id,
+                "quantity": rng.choices((1, 2, 3), (80, 15, 5))[0],
+                "created_at": created_at,
+            })
+
+
+def _reset_sequences(engine):
+    """Move PostgreSQL id sequences past the explicitly inserted ids."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table, column in (("categories", "id"), ("products", "id"), ("orders", "id"),
+                              ("order_items", "id"), ("cart_items", "id"), ("order_events", "seq")):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                f"COALESCE((SELECT MAX({column}) FROM {table}), 0) + 1, false)"
+            ))
+
+
+def _check_empty(engine, reset: bool):
+    seeded_tables = [OrderEvent, CartItem, OrderItem, Order, OrderStatusStats]
+    with engine.begin() as conn:
+        if reset:
+            for model in seeded_tables:
+                conn.execute(model.__table__.delete())
+            conn.execute(product_categories.delete())
+            conn.execute(Product.__table__.delete())
+            conn.execute(Category.__table__.delete())
+            return
+        for model in (Product, Category, Order):
+            if conn.execute(select(func.count()).select_from(model.__table__)).scalar():
+                raise SystemExit(
+                    f"Table {model.__tablename__} is not empty; use a fresh database or pass --reset"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog and order history")
+    parser.add_argument("--database-url", default=settings.database_url, help="Defaults to DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--items-per-order", type=float, default=2.5, help="Mean line items per order")
+    parser.add_argument("--customers", type=int, help="Distinct customers (default: orders / 4)")
+    parser.add_argument("--carts", type=int, default=2000, help="Open guest carts")
+    parser.add_argument("--days", type=int, default=365, help="Length of the order history")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(),
+                        help="Last day of the history, YYYY-MM-DD (default: today)")
+    parser.add_argument("--utc-offset-hours", type=float, default=0.0, help="Local time of the diurnal curve")
+    parser.add_argument("--growth", type=float, default=0.5, help="Daily volume growth over the period (0.5 = +50%%)")
+    parser.add_argument("--zipf-exponent", type=float, default=1.07, help="Skew of product popularity")
+    parser.add_argument("--inactive-share", type=float, default=0.03, help="Share of discontinued products")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per table per write")
+    parser.add_argument("--reset", action="store_true", help="Delete existing catalog, carts and orders first")
+    args = parser.parse_args()
+    args.customers = args.customers or max(args.orders // 4, 1)
+
+    start = datetime.combine(args.end - timedelta(days=args.days), datetime.min.time(), timezone.utc)
+    if start.timestamp() * 1000 < EPOCH_MS:
+        raise SystemExit("Order numbers start at 2024-01-01; shorten --days or move --end")
+
+    engine = create_engine(args.database_url)
+    apply_sqlite_pragmas(engine)
+    if engine.dialect.name == "sqlite":
+        # A failed load is simply rerun, so don't wait for fsyncs
+        @event.listens_for(engine, "connect")
+        def bulk_load_pragmas(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA synchronous=OFF")
+    Base.metadata.create_all(bind=engine)
+    _check_empty(engine, args.reset)
+
+    rng = random.Random(args.seed)
+    writer = BatchWriter(engine, args.batch_size)
+    started = time.perf_counter()
+    method = "COPY" if writer.use_copy else "executemany"
+    print(f"Seeding {engine.url.render_as_string(hide_password=True)} with seed {args.seed} ({method})")
+
+    prices = seed_catalog(writer, args, rng, start)
+    writer.flush()
+    print(f"   catalog: {args.categories} categories, {args.products} products "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    seed_orders(writer, args, rng, prices)
+    writer.flush()
+    print(f"   orders: {writer.written.get('orders', 0)} orders, {writer.written.get('order_items', 0)} items "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    seed_carts(writer, args, rng)
+    writer.flush()
+    _reset_sequences(engine)
+    with Session(engine) as db:
+        reconcile_order_stats(db)
+
+    elapsed = time.perf_counter() - started
+    rows = sum(writer.written.values())
+    print(f"✅ {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    for table, count in sorted(writer.written.items()):
+        print(f"   {table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
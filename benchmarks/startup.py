@@ -0,0 +1,96 @@
+"""
+Cold-start benchmark: how long until a fresh server process answers.
+
+Each run starts uvicorn in a new process and measures:
+  - import:        importing the app module in a bare interpreter
+  - first request: from process start until /health returns 200
+  - docs:          the first /openapi.json request after that
+
+Usage:
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --app app.main_prod:app --env AUTO_CREATE_SCHEMA=False
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(module: str, env: dict) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_request(app: str, env: dict, timeout: float) -> tuple:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"Server did not answer within {timeout}s")
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                if httpx.get(base_url + "/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.005)
+        first_request = time.perf_counter() - started
+        docs_started = time.perf_counter()
+        httpx.get(base_url + "/openapi.json", timeout=30.0).raise_for_status()
+        return first_request, time.perf_counter() - docs_started
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first request of a cold server")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app as module:attribute")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE for the server")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.update(item.split("=", 1) for item in args.env)
+    module = args.app.split(":")[0]
+
+    imports, firsts, docs = [], [], []
+    for run in range(args.runs):
+        imports.append(measure_import(module, env))
+        first_request, openapi = measure_first_request(args.app, env, args.timeout)
+        firsts.append(first_request)
+        docs.append(openapi)
+        print(f"run {run + 1}: import {imports[-1] * 1000:.0f} ms, "
+              f"first request {first_request * 1000:.0f} ms, openapi {openapi * 1000:.0f} ms")
+
+    print(f"median: import {statistics.median(imports) * 1000:.0f} ms, "
+          f"first request {statistics.median(firsts) * 1000:.0f} ms, "
+          f"openapi {statistics.median(docs) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Prebuild the OpenAPI schema so a cold-started app serves /docs without
+generating it. Run while building the image and set OPENAPI_CACHE_FILE:
+    python build_openapi_cache.py [path] [app.main|app.main_prod]
+"""
+import importlib
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.openapi_cache import write_openapi_cache
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "openapi.json"
+    module = importlib.import_module(sys.argv[2] if len(sys.argv) > 2 else "app.main")
+    schema = write_openapi_cache(module.app, path)
+    print(f"✅ Wrote OpenAPI schema ({len(schema['paths'])} paths) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Create any missing database tables. Run it as a deploy step when the app
+runs with AUTO_CREATE_SCHEMA=False, then apply migrations:
+    python create_schema.py && alembic upgrade head
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import create_schema
+
+
+def main():
+    create_schema()
+    print("✅ Database tables are in place")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 // Admin Panel JavaScript
 const API_BASE = 'http://127.0.0.1:8003';
 let authToken = localStorage.getItem('adminToken');
+let orderEvents = null;
+let lastOrderSeq = 0;
+const EVENTS_RETRY_MS = 3000;
 
 // Check if already logged in
 document.addEventListener('DOMContentLoaded', function() {
@@ -8,6 +11,7 @@ document.addEventListener('DOMContentLoaded', function() {
         showAdminPanel();
         loadProducts();
         loadOrders();
+        subscribeToOrderEvents();
     }
 });
 
@@ -20,6 +24,7 @@ document.getElementById('loginForm').addEventListener('submit', async function(e
     
     try {
         const response = await fetch(`${API_BASE}/api/v1/auth/admin/login`, {
+            credentials: 'include',
             method: 'POST',
             headers: {
                 'Content-Type': 'application/x-www-form-urlencoded',
@@ -35,6 +40,7 @@ document.getElementById('loginForm').addEventListener('submit', async function(e
             showAdminPanel();
             loadProducts();
             loadOrders();
+            subscribeToOrderEvents();
         } else {
             const error = await response.json();
             showError(error.detail || 'Login failed');
@@ -46,8 +52,20 @@ document.getElementById('loginForm').addEventListener('submit', async function(e
 
 // Logout handler
 document.getElementById('logoutBtn').addEventListener('click', function() {
+    // Revoke the token server-side too; the local logout happens regardless
+    fetch(`${API_BASE}/api/v1/auth/admin/logout`, {
+        credentials: 'include',
+        method: 'POST',
+        headers: {
+            'Authorization': `Bearer ${authToken}`
+        }
+    }).catch(() => {});
     localStorage.removeItem('adminToken');
     authToken = null;
+    if (orderEvents) {
+        orderEvents.close();
+        orderEvents = null;
+    }
     showLoginForm();
 });
 
@@ -70,6 +88,7 @@ document.getElementById('addProductForm').addEventListener('submit', async funct
     
     try {
         const response = await fetch(`${API_BASE}/api/v1/products/`, {
+            credentials: 'include',
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -111,7 +130,7 @@ function showError(message) {
 // Load products
 async function loadProducts() {
     try {
-        const response = await fetch(`${API_BASE}/api/v1/products/`);
+        const response = await fetch(`${API_BASE}/api/v1/products/`, { credentials: 'include' });
         const products = await response.json();
         
         const tbody = document.getElementById('productsTable');
@@ -137,6 +156,7 @@ async function loadProducts() {
 async function loadOrders() {
     try {
         const response = await fetch(`${API_BASE}/api/v1/orders/admin/all`, {
+            credentials: 'include',
             headers: {
                 'Authorization': `Bearer ${authToken}`
             }
@@ -146,28 +166,140 @@ async function loadOrders() {
             const orders = await response.json();
             
             const tbody = document.getElementById('ordersTable');
-            tbody.innerHTML = orders.map(order => `
-                <tr>
-                    <td>#${order.order_number}</td>
-                    <td>${order.customer_name}</td>
-                    <td>${order.customer_phone}</td>
-                    <td>$${order.total_amount}</td>
-                    <td><span class="badge bg-${getStatusColor(order.status)}">${order.status}</span></td>
-                    <td>${new Date(order.created_at).toLocaleDateString()}</td>
-                    <td>
-                        ${order.whatsapp_sent ? 
-                            '<span class="badge bg-success">Sent</span>' : 
-                            '<span class="badge bg-warning">Pending</span>'
-                        }
-                    </td>
-                </tr>
-            `).join('');
+            tbody.innerHTML = orders.map(renderOrderRow).join('');
         }
     } catch (error) {
         console.error('Error loading orders:', error);
     }
 }
 
+function renderOrderRow(order) {
+    return `
+        <tr data-order-id="${order.id}">
+            <td>#${order.order_number}</td>
+            <td>${order.customer_name}</td>
+            <td>${order.customer_phone || ''}</td>
+            <td>$${order.total_amount}</td>
+            <td class="order-status"><span class="badge bg-${getStatusColor(order.status)}">${order.status}</span></td>
+            <td>${new Date(order.created_at).toLocaleDateString()}</td>
+            <td>
+                ${order.whatsapp_sent ? 
+                    '<span class="badge bg-success">Sent</span>' : 
+                    '<span class="badge bg-warning">Pending</span>'
+                }
+            </td>
+        </tr>
+    `;
+}
+
+// Live order updates pushed by the server instead of polling
+async function subscribeToOrderEvents(resumed = false) {
+    if (orderEvents) {
+        orderEvents.close();
+        orderEvents = null;
+    }
+    if (!authToken) {
+        return;
+    }
+    
+    // EventSource cannot send headers, so the stream is opened with a
+    // single-use ticket; the access token never appears in a URL
+    let ticket;
+    try {
+        const response = await fetch(`${API_BASE}/api/v1/orders/admin/events/ticket`, {
+            credentials: 'include',
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${authToken}`
+            }
+        });
+        if (!response.ok) {
+            return;
+        }
+        ticket = (await response.json()).ticket;
+    } catch (error) {
+        setTimeout(() => subscribeToOrderEvents(true), EVENTS_RETRY_MS);
+        return;
+    }
+    if (!authToken) {
+        return;  // Logged out while the ticket was requested
+    }
+    
+    const source = new EventSource(`${API_BASE}/api/v1/orders/admin/events?ticket=${encodeURIComponent(ticket)}`);
+    orderEvents = source;
+    let reconnecting = resumed;
+    
+    source.addEventListener('order.created', function(e) {
+        const order = JSON.parse(e.data);
+        lastOrderSeq = order.seq || lastOrderSeq;
+        document.getElementById('ordersTable').insertAdjacentHTML('afterbegin', renderOrderRow(order));
+    });
+    
+    source.addEventListener('order.status_changed', function(e) {
+        const event = JSON.parse(e.data);
+        lastOrderSeq = event.seq || lastOrderSeq;
+        setOrderRowStatus(event.order_id, event.status);
+    });
+    
+    // After a dropped connection, fetch only the changes that were missed
+    source.addEventListener('error', function() {
+        reconnecting = true;
+        // The browser retries with the spent ticket and gives up; reopen with a new one
+        if (source.readyState === EventSource.CLOSED && orderEvents === source) {
+            setTimeout(() => subscribeToOrderEvents(true), EVENTS_RETRY_MS);
+        }
+    });
+    source.addEventListener('open', function() {
+        if (reconnecting && lastOrderSeq) {
+            syncOrderChanges();
+        }
+        reconnecting = false;
+    });
+    
+    // Too many missed events: reload the list once instead of replaying them
+    source.addEventListener('resync', loadOrders);
+}
+
+function setOrderRowStatus(orderId, status) {
+    const cell = document.querySelector(`tr[data-order-id="${orderId}"] .order-status`);
+    if (cell) {
+        cell.innerHTML = `<span class="badge bg-${getStatusColor(status)}">${status}</span>`;
+    }
+}
+
+async function syncOrderChanges() {
+    try {
+        let hasMore = true;
+        while (hasMore) {
+            const response = await fetch(`${API_BASE}/api/v1/orders/admin/changes?since=${lastOrderSeq}`, {
+                credentials: 'include',
+                headers: {
+                    'Authorization': `Bearer ${authToken}`
+                }
+            });
+            if (!response.ok) {
+                return;
+            }
+            const feed = await response.json();
+            if (feed.changes.some(change => change.event_type === 'created')) {
+                // New orders need their full rows; reload the list once
+                lastOrderSeq = feed.next_since;
+                loadOrders();
+                return;
+            }
+            feed.changes.forEach(change => {
+                if (change.event_type === 'status_changed') {
+                    setOrderRowStatus(change.order_id, change.status);
+                }
+            });
+            lastOrderSeq = feed.next_since;
+            hasMore = feed.has_more;
+        }
+    } catch (error) {
+        console.error('Error syncing order changes:', error);
+    }
+}
+
 // Get category ID (create if doesn't exist)
 async function getCategoryId(categoryName) {
     if (!categoryName || categoryName === '') {
@@ -176,7 +308,7 @@ async function getCategoryId(categoryName) {
     
     try {
         // Try to get existing categories
-        const response = await fetch(`${API_BASE}/api/v1/products/categories`);
+        const response = await fetch(`${API_BASE}/api/v1/products/categories`, { credentials: 'include' });
         if (response.ok) {
             const categories = await response.json();
             const existingCategory = categories.find(cat => cat.name === categoryName);
@@ -187,6 +319,7 @@ async function getCategoryId(categoryName) {
         
         // Create new category if doesn't exist
         const createResponse = await fetch(`${API_BASE}/api/v1/products/categories/`, {
+            credentials: 'include',
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -213,6 +346,7 @@ async function deleteProduct(productId) {
     if (confirm('Are you sure you want to delete this product?')) {
         try {
             const response = await fetch(`${API_BASE}/api/v1/products/${productId}`, {
+                credentials: 'include',
                 method: 'DELETE',
                 headers: {
                     'Authorization': `Bearer ${authToken}`
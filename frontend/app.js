@@ -90,7 +90,7 @@ class ShopEasy {
 
     async loadCategories() {
         try {
-            const response = await fetch(`${this.apiBaseUrl}/products/categories/`);
+            const response = await fetch(`${this.apiBaseUrl}/products/categories/`, { credentials: 'include' });
             if (response.ok) {
                 this.categories = await response.json();
                 this.renderCategoryFilter();
@@ -108,7 +108,7 @@ class ShopEasy {
             document.getElementById('productsGrid').style.display = 'none';
             document.getElementById('noProducts').style.display = 'none';
 
-            const response = await fetch(`${this.apiBaseUrl}/products/`);
+            const response = await fetch(`${this.apiBaseUrl}/products/`, { credentials: 'include' });
             console.log('Products API response:', response.status, response.ok);
             
             if (response.ok) {
@@ -423,20 +423,29 @@ class ShopEasy {
             }))
         };
 
+        // Reuse the same key when retrying after a network failure so the
+        // server replays the original order instead of placing a duplicate
+        if (!this.checkoutIdempotencyKey) {
+            this.checkoutIdempotencyKey = crypto.randomUUID();
+        }
+
         try {
             document.getElementById('placeOrderBtn').disabled = true;
             document.getElementById('placeOrderBtn').innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Placing Order...';
 
             const response = await fetch(`${this.apiBaseUrl}/orders/`, {
+                credentials: 'include',
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Idempotency-Key': this.checkoutIdempotencyKey,
                 },
                 body: JSON.stringify(orderData)
             });
 
             if (response.ok) {
                 const result = await response.json();
+                this.checkoutIdempotencyKey = null;
                 this.cart = [];
                 this.saveCart();
                 this.updateCartUI();
@@ -453,6 +462,8 @@ class ShopEasy {
                 // Clear form
                 form.reset();
             } else {
+                // The server answered, so a corrected order needs a fresh key
+                this.checkoutIdempotencyKey = null;
                 const error = await response.json();
                 throw new Error(error.detail || 'Failed to place order');
             }
@@ -565,6 +576,7 @@ class AdminLogin {
         
         try {
             const response = await fetch(`${this.apiBaseUrl}/auth/admin/login`, {
+                credentials: 'include',
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/x-www-form-urlencoded',
@@ -0,0 +1,33 @@
+"""
+Recompute the order statistics rollup from the orders table and report drift.
+Safe to run from cron; exits with status 1 when drift was found and repaired.
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.utils.order_stats import reconcile_order_stats
+
+
+def main():
+    db = SessionLocal()
+    try:
+        drift = reconcile_order_stats(db)
+    finally:
+        db.close()
+
+    if not drift:
+        print("✅ Order statistics are in sync")
+        return 0
+
+    print("⚠️ Drift found and repaired:")
+    for status, delta in sorted(drift.items()):
+        print(f"   {status}: count {delta['count']:+d}, amount {delta['amount']:+.2f}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())